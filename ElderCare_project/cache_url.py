@@ -0,0 +1,42 @@
+from urllib.parse import parse_qsl, urlsplit
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'pymemcache': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+# Backends every worker process sees the same entries of
+SHARED_CACHE_SCHEMES = ('db', 'redis', 'rediss', 'memcached', 'pymemcache')
+
+def is_shared_cache_url(url):
+    return urlsplit(url).scheme in SHARED_CACHE_SCHEMES
+
+def parse_cache_url(url):
+    """
+    Build a CACHES entry from a URL such as redis://localhost:6379/1, memcached://a:11211,b:11211,
+    file:///var/tmp/eldercare-cache, db://cache_table or locmem://. Query parameters set TIMEOUT
+    and KEY_PREFIX.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in CACHE_BACKENDS:
+        raise ValueError(f'Unsupported cache URL scheme {parts.scheme!r}')
+    config = {'BACKEND': CACHE_BACKENDS[parts.scheme]}
+    if parts.scheme in ('redis', 'rediss'):
+        config['LOCATION'] = url.split('?', 1)[0]
+    elif parts.scheme in ('memcached', 'pymemcache'):
+        config['LOCATION'] = parts.netloc.split(',')
+    elif parts.scheme == 'file':
+        config['LOCATION'] = parts.path
+    elif parts.scheme in ('db', 'locmem'):
+        config['LOCATION'] = parts.netloc or parts.path.lstrip('/') or ('django_cache' if parts.scheme == 'db' else '')
+    for key, value in parse_qsl(parts.query):
+        if key.lower() == 'timeout':
+            config['TIMEOUT'] = None if value.lower() == 'none' else int(value)
+        elif key.lower() == 'key_prefix':
+            config['KEY_PREFIX'] = value
+    return config
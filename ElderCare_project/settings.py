@@ -1,6 +1,11 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache_url import is_shared_cache_url, parse_cache_url
+from .database_url import parse_database_url, sqlite_database
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'your-secret-key'
@@ -20,17 +25,48 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so session and auth queries are counted too
+    'Elderly.middleware.MetricsMiddleware',
+    'Elderly.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'Elderly.middleware.RoleProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Innermost so captures cover the view rather than the middleware stack
+    'Elderly.middleware.ProfilingMiddleware',
 ]
 
+# Per-request query count, DB time and duplicate SQL in X-DB-* headers and the
+# Elderly.middleware log; requests above QUERY_BUDGET queries are logged as warnings
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', str(DEBUG)).lower() in ('1', 'true', 'yes')
+QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', '20'))
+
+# Opt-in cProfile/tracemalloc captures, written to PROFILING_DIR and summarised by
+# profile_report: every request (PROFILING_ENABLED), requests sending the token in an
+# X-Profile header (PROFILING_TOKEN), or one in PROFILING_SAMPLE_RATE requests
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+
+# Request metrics served at /metrics in the Prometheus text format. With several worker
+# processes, point METRICS_DIR at a directory they share (cleared on deploy) so each
+# scrape adds up every worker. Scrapers send "Authorization: Bearer <METRICS_TOKEN>";
+# without a token the endpoint answers 404, as it does with METRICS_ENABLED off.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 ROOT_URLCONF = 'ElderCare_project.urls'
 
+# Loads the session user together with its role profile in one query. ModelBackend stays
+# listed for one release so sessions signed in before the switch, which name it, stay valid
+AUTHENTICATION_BACKENDS = ['Elderly.auth.RoleProfileBackend', 'django.contrib.auth.backends.ModelBackend']
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -49,12 +85,43 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'ElderCare_project.wsgi.application'
 
+# Database from an env URL; defaults to the project SQLite file tuned for concurrent writers.
+# DB_CONN_MAX_AGE=0 restores a new connection per request.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / "db.sqlite3",
-    }
+    'default': (
+        parse_database_url(os.environ['DATABASE_URL'], BASE_DIR, DB_CONN_MAX_AGE)
+        if os.environ.get('DATABASE_URL')
+        else sqlite_database(BASE_DIR / 'db.sqlite3', DB_CONN_MAX_AGE)
+    ),
+}
+
+# Cache backend from an env URL: locmem:// (default), file:///path, db://table,
+# redis://host:6379/0 or memcached://host:11211. Test runs use ElderCare_project.test_settings.
+CACHE_URL = os.environ.get('CACHE_URL', 'locmem://')
+CACHES = {
+    'default': parse_cache_url(CACHE_URL),
+}
+# Only a cache every worker shares can hold data that other workers invalidate, such as
+# sessions and dashboards; with a per-process cache those are read from the database
+CACHE_SHARED = is_shared_cache_url(CACHE_URL)
+
+# With a shared cache, sessions are read from it and only written through to the database
+# when they change; SESSION_ENGINE=signed_cookies keeps them out of the server entirely.
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'db': 'django.contrib.sessions.backends.db',
 }
+SESSION_ENGINE_NAME = os.environ.get('SESSION_ENGINE', 'cached_db' if CACHE_SHARED else 'db')
+if SESSION_ENGINE_NAME in ('cached_db', 'cache') and not CACHE_SHARED:
+    # A session logged out on one worker would stay valid in the others' caches
+    raise ImproperlyConfigured(
+        f'SESSION_ENGINE={SESSION_ENGINE_NAME} needs a CACHE_URL shared by every worker (redis, memcached or db).'
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_ENGINE_NAME]
+SESSION_COOKIE_HTTPONLY = True
 
 AUTH_PASSWORD_VALIDATORS = [
     {
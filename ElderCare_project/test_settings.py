@@ -0,0 +1,13 @@
+# Settings for the test suite: python manage.py test --settings=ElderCare_project.test_settings,
+# or DJANGO_SETTINGS_MODULE=ElderCare_project.test_settings under pytest-django.
+from .settings import *  # noqa: F401,F403
+from .settings import SESSION_ENGINES, os, parse_cache_url
+
+# A private in-memory cache, whatever CACHE_URL points at, so clearing it between tests
+# never touches a real deployment's cache
+CACHES = {
+    'default': parse_cache_url(os.environ.get('TEST_CACHE_URL', 'locmem://')),
+}
+# The suite runs in one process, so its local cache is shared by every request it makes
+CACHE_SHARED = True
+SESSION_ENGINE = SESSION_ENGINES['cached_db']
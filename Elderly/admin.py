@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import (
-    CustomUser, ElderlyUser, Caregiver, Doctor, Admin, EmergencyNotification, FeedbackNotification,
-    HealthRecord, ServiceRequest, Observation, Prescription, Billing
+    CustomUser, ElderlyUser, Caregiver, CaregiverAssignment, Doctor, Admin, EmergencyNotification, FeedbackNotification,
+    HealthRecord, VitalReading, VitalRollup, ServiceRequest, DoctorAvailability, Appointment, Observation, Prescription,
+    MedicationReminder, Billing, PlatformStat, Job
 )
 
 class CustomUserAdmin(UserAdmin):
@@ -29,12 +30,20 @@ class CustomUserAdmin(UserAdmin):
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(ElderlyUser)
 admin.site.register(Caregiver)
+admin.site.register(CaregiverAssignment)
 admin.site.register(Doctor)
 admin.site.register(Admin)
 admin.site.register(EmergencyNotification)
 admin.site.register(FeedbackNotification)
 admin.site.register(HealthRecord)
+admin.site.register(VitalReading)
+admin.site.register(VitalRollup)
 admin.site.register(ServiceRequest)
 admin.site.register(Observation)
+admin.site.register(DoctorAvailability)
+admin.site.register(Appointment)
 admin.site.register(Prescription)
-admin.site.register(Billing)
\ No newline at end of file
+admin.site.register(MedicationReminder)
+admin.site.register(Billing)
+admin.site.register(PlatformStat)
+admin.site.register(Job)
\ No newline at end of file
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ElderlyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'Elderly'
\ No newline at end of file
+    name = 'Elderly'
+
+    def ready(self):
+        from . import signals  # noqa: F401
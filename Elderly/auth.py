@@ -0,0 +1,28 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .models import CustomUser
+
+# Reverse one-to-one accessor of the profile model for each role
+ROLE_PROFILE_FIELDS = {
+    'elderly': 'elderlyuser',
+    'caregiver': 'caregiver',
+    'doctor': 'doctor',
+    'admin': 'admin',
+}
+
+class RoleProfileBackend(ModelBackend):
+    """ModelBackend that loads the session user joined to its role profiles in a single query."""
+
+    def get_user(self, user_id):
+        try:
+            user = CustomUser._default_manager.select_related(*ROLE_PROFILE_FIELDS.values()).get(pk=user_id)
+        except CustomUser.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+def role_profile(user):
+    """The profile row for the user's role, or None if it has not been created yet."""
+    field = ROLE_PROFILE_FIELDS.get(getattr(user, 'role', None))
+    if field is None:
+        return None
+    return getattr(user, field, None)
@@ -0,0 +1,203 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Appointment, Doctor, DoctorAvailability
+
+logger = logging.getLogger(__name__)
+
+# Appointments are booked in fixed-length slots, which keeps the overlap check a bounded range query
+SLOT_LENGTH = timedelta(minutes=30)
+DEFAULT_SLOT_COUNT = 10
+MAX_SLOT_COUNT = 100
+CALENDARS_MAX_AGE = 300
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class DoctorCalendar:
+    """Availability windows and bookings of one doctor, each kept sorted for bisection."""
+
+    def __init__(self, windows=(), bookings=()):
+        self.windows = merge_intervals(windows)
+        self.window_ends = [end for _, end in self.windows]
+        # Bookings never overlap, so sorting by start also sorts them by end
+        self.bookings = sorted(bookings)
+        self.booking_ends = [end for _, end in self.bookings]
+
+    def free_slots(self, after, length=SLOT_LENGTH):
+        """Yield free (start, end) slots beginning at or after `after`, earliest first."""
+        bookings, booking_ends = self.bookings, self.booking_ends
+        j = bisect.bisect_right(booking_ends, after)
+        for i in range(bisect.bisect_right(self.window_ends, after), len(self.windows)):
+            window_start, window_end = self.windows[i]
+            start = window_start
+            if after > start:
+                # Keep slots on the window's grid
+                start += -((window_start - after) // length) * length
+            while start + length <= window_end:
+                while j < len(bookings) and booking_ends[j] <= start:
+                    j += 1
+                if j < len(bookings) and bookings[j][0] < start + length:
+                    start = booking_ends[j]
+                    continue
+                yield start, start + length
+                start += length
+
+def tag_slots(doctor_id, slots):
+    for start, end in slots:
+        yield start, doctor_id, end
+
+class SlotIndex:
+    """
+    Per-process calendars of verified doctors for free-slot search.
+
+    Each doctor's future windows and bookings are held as sorted lists, so the earliest
+    free slots for a specialization come from a lazy k-way merge over the doctors'
+    slot generators rather than from scanning the appointment tables.
+    """
+
+    def __init__(self, max_age=CALENDARS_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._calendars = None  # doctor_id -> DoctorCalendar
+        self._doctors = {}  # doctor_id -> (specialization, display name)
+        self._loaded_at = 0.0
+        self._rebuilding = False
+
+    def _load(self, doctor_ids=None):
+        now = timezone.now()
+        doctors = Doctor.objects.filter(verified_status=True)
+        windows = DoctorAvailability.objects.filter(ends_at__gt=now, doctor__verified_status=True)
+        bookings = Appointment.objects.filter(ends_at__gt=now, doctor__verified_status=True)
+        if doctor_ids is not None:
+            doctors = doctors.filter(id__in=doctor_ids)
+            windows = windows.filter(doctor_id__in=doctor_ids)
+            bookings = bookings.filter(doctor_id__in=doctor_ids)
+        info = {
+            doctor_id: (specialization, f'{first_name or ""} {last_name or ""}'.strip())
+            for doctor_id, specialization, first_name, last_name
+            in doctors.values_list('id', 'specialization', 'first_name', 'last_name')
+        }
+        doctor_windows = {doctor_id: [] for doctor_id in info}
+        doctor_bookings = {doctor_id: [] for doctor_id in info}
+        # A doctor verified between these queries is skipped; the refresh its save queues adds them
+        for doctor_id, starts_at, ends_at in windows.values_list('doctor_id', 'starts_at', 'ends_at').iterator():
+            if doctor_id in doctor_windows:
+                doctor_windows[doctor_id].append((starts_at, ends_at))
+        for doctor_id, starts_at, ends_at in bookings.values_list('doctor_id', 'starts_at', 'ends_at').iterator():
+            if doctor_id in doctor_bookings:
+                doctor_bookings[doctor_id].append((starts_at, ends_at))
+        calendars = {
+            doctor_id: DoctorCalendar(doctor_windows[doctor_id], doctor_bookings[doctor_id]) for doctor_id in info
+        }
+        return calendars, info
+
+    def _install(self, calendars, doctors):
+        with self._lock:
+            self._calendars, self._doctors = calendars, doctors
+            self._loaded_at = time.monotonic()
+            self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        try:
+            self._install(*self._load())
+        except Exception:
+            # The current calendars keep serving; the next stale lookup tries again
+            logger.exception('Rebuilding the doctor calendars failed')
+            with self._lock:
+                self._rebuilding = False
+        finally:
+            close_old_connections()
+
+    def _get_calendars(self):
+        if self._calendars is None:
+            self._install(*self._load())
+        elif time.monotonic() - self._loaded_at > self.max_age:
+            with self._lock:
+                start = not self._rebuilding
+                self._rebuilding = True
+            if start:
+                # Past windows and bookings drop out on rebuild; keep serving meanwhile
+                threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+        return self._calendars, self._doctors
+
+    def invalidate(self):
+        with self._lock:
+            self._calendars = None
+
+    def refresh_doctor(self, doctor_id):
+        if self._calendars is None:
+            return
+        calendars, doctors = self._load([doctor_id])
+        with self._lock:
+            if self._calendars is None:
+                return
+            if doctor_id in calendars:
+                self._calendars[doctor_id] = calendars[doctor_id]
+                self._doctors[doctor_id] = doctors[doctor_id]
+            else:
+                self._calendars.pop(doctor_id, None)
+                self._doctors.pop(doctor_id, None)
+
+    def earliest_slots(self, specialization, count=DEFAULT_SLOT_COUNT, after=None, length=SLOT_LENGTH):
+        """The `count` earliest free slots across verified doctors of a specialization."""
+        after = after or timezone.now()
+        calendars, doctors = self._get_calendars()
+        streams = [
+            tag_slots(doctor_id, calendars[doctor_id].free_slots(after, length))
+            for doctor_id, (doctor_specialization, _) in list(doctors.items())
+            if doctor_specialization == specialization and doctor_id in calendars
+        ]
+        return [
+            {'doctor_id': doctor_id, 'doctor_name': doctors.get(doctor_id, ('', ''))[1], 'start': start, 'end': end}
+            for start, doctor_id, end in islice(heapq.merge(*streams), count)
+        ]
+
+slot_index = SlotIndex()
+
+def book_appointment(service_request, doctor, starts_at, length=SLOT_LENGTH):
+    """
+    Book a slot for a service request; returns None if the doctor is not free then.
+
+    If a concurrent submission already booked this request, its appointment is returned instead.
+    """
+    ends_at = starts_at + length
+    with transaction.atomic():
+        # Serialise bookings per doctor so the overlap check cannot race another booking
+        list(Doctor.objects.select_for_update().filter(id=doctor.id).values_list('id', flat=True))
+        # Checked against merged windows, as free_slots offers slots spanning adjacent ones
+        windows = DoctorAvailability.objects.filter(
+            doctor=doctor, starts_at__lt=ends_at, ends_at__gt=starts_at
+        ).values_list('starts_at', 'ends_at')
+        available = any(start <= starts_at and ends_at <= end for start, end in merge_intervals(windows))
+        # Every appointment is one slot long, so only those starting within a slot can overlap
+        overlapping = Appointment.objects.filter(
+            doctor=doctor, starts_at__gt=starts_at - length, starts_at__lt=ends_at
+        ).exists()
+        if not available or overlapping:
+            return None
+        try:
+            with transaction.atomic():
+                appointment = Appointment.objects.create(
+                    service_request=service_request, doctor=doctor, starts_at=starts_at, ends_at=ends_at
+                )
+        except IntegrityError:
+            return Appointment.objects.get(service_request=service_request)
+        service_request.doctor = doctor
+        service_request.status = 'scheduled'
+        service_request.save(update_fields=['doctor', 'status'])
+    return appointment
@@ -0,0 +1,48 @@
+from django.db import connection, transaction
+
+from .dashboards import invalidate_elderly_dashboard
+from .models import ServiceRequest
+from .search import refresh_request_scope
+from .stats import record_status_change
+
+CLAIM_CANDIDATES = 10
+
+def claim_request(request_id, doctor):
+    """
+    Accept a pending request for this doctor; returns False if it is no longer pending or for another specialization.
+
+    The status check and the write are one conditional UPDATE, so when two doctors
+    accept the same request exactly one of them gets it.
+    """
+    with transaction.atomic():
+        claimed = ServiceRequest.objects.filter(
+            id=request_id, status='pending', specialization=doctor.specialization
+        ).update(status='accepted', doctor=doctor) == 1
+        if claimed:
+            # A queryset update sends no signals, so the statistics and dashboard are updated here
+            timestamp, elderly_user_id = (
+                ServiceRequest.objects.values_list('timestamp', 'elderly_user_id').get(id=request_id)
+            )
+            transaction.on_commit(lambda: record_status_change('service_request', timestamp, 'pending', 'accepted'))
+            transaction.on_commit(lambda: invalidate_elderly_dashboard(elderly_user_id))
+            refresh_request_scope(request_id, elderly_user_id, doctor.id)
+    return claimed
+
+def claim_next_request(doctor):
+    """
+    Hand this doctor the oldest pending request of their specialization nobody else is claiming.
+
+    With SKIP LOCKED, concurrent claimers each lock a different candidate instead of queueing
+    on the head of the list. Elsewhere candidates are tried in order and the conditional
+    UPDATE in claim_request decides who wins each one.
+    """
+    with transaction.atomic():
+        candidates = ServiceRequest.objects.filter(
+            status='pending', specialization=doctor.specialization
+        ).order_by('timestamp', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        for request_id in candidates.values_list('id', flat=True)[:CLAIM_CANDIDATES]:
+            if claim_request(request_id, doctor):
+                return ServiceRequest.objects.get(id=request_id)
+    return None
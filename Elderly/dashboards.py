@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CaregiverAssignment, HealthRecord, ServiceRequest
+
+DASHBOARD_CACHE_TIMEOUT = 300
+
+def dashboard_cache_key(role, profile_id):
+    return f'dashboard:{role}:{profile_id}'
+
+def cached_context(key, build):
+    # Invalidations only reach a cache shared by every worker; a per-process one is skipped
+    if not settings.CACHE_SHARED:
+        return build()
+    context = cache.get(key)
+    if context is None:
+        context = build()
+        cache.set(key, context, DASHBOARD_CACHE_TIMEOUT)
+    return context
+
+def elderly_dashboard_context(elderly_user):
+    def build():
+        # Ensure default health record exists
+        HealthRecord.objects.get_or_create(elderly_user=elderly_user)
+        latest_request = (
+            ServiceRequest.objects.filter(elderly_user=elderly_user).order_by('-timestamp').only('status').first()
+        )
+        return {'request_status': latest_request.status if latest_request else None}
+    return cached_context(dashboard_cache_key('elderly', elderly_user.id), build)
+
+def assigned_user_names(caregiver):
+    """Display names of the caregiver's assigned users, keyed by id, for labelling live alerts."""
+    return {
+        elderly_user.id: f'{elderly_user.first_name or ""} {elderly_user.last_name or ""}'.strip()
+        for elderly_user in caregiver.assigned_users.all()
+    }
+
+def caregiver_dashboard_context(caregiver):
+    """Names of the assigned users for the live alerts, materialised so a warm page reads nothing."""
+    def build():
+        return {'assigned_user_names': assigned_user_names(caregiver)}
+    return cached_context(dashboard_cache_key('caregiver', caregiver.id), build)
+
+def invalidate_elderly_dashboard(elderly_user_id):
+    cache.delete(dashboard_cache_key('elderly', elderly_user_id))
+
+def invalidate_caregiver_dashboards(elderly_user_id):
+    """Drop the cached dashboard of every caregiver assigned to this elderly user."""
+    caregiver_ids = CaregiverAssignment.objects.filter(elderly_user_id=elderly_user_id).values_list('caregiver_id', flat=True)
+    cache.delete_many([dashboard_cache_key('caregiver', caregiver_id) for caregiver_id in caregiver_ids])
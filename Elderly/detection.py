@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import VitalReading
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional, fall back to a plain loop
+    np = None
+
+# Normal ranges; readings outside [low, high] are flagged. Blood pressure is checked on
+# both the systolic value (stored as the reading value) and the diastolic value.
+HEALTH_METRIC_RANGES = {
+    'blood_pressure': {'low': 90, 'high': 140},
+    'heart_rate': {'low': 60, 'high': 100},
+    'sugar_levels': {'low': 70, 'high': 110},  # Fasting glucose levels
+}
+DIASTOLIC_RANGE = {'low': 60, 'high': 90}
+DEFAULT_WINDOW = timedelta(hours=24)
+
+METRICS = [metric for metric, _ in VitalReading.METRIC_CHOICES]
+METRIC_CODES = {metric: code for code, metric in enumerate(METRICS)}
+METRIC_LABELS = dict(VitalReading.METRIC_CHOICES)
+
+def _flag(elderly_user_id, metric, value, diastolic, measured_at, direction):
+    if metric == 'blood_pressure':
+        display_value = f'{int(value)}/{int(diastolic)}'
+    else:
+        display_value = f'{value:g}'
+    return {
+        'elderly_user_id': elderly_user_id,
+        'metric': metric,
+        'label': METRIC_LABELS[metric],
+        'value': display_value,
+        'direction': direction,
+        'measured_at': measured_at,
+    }
+
+def _directions_numpy(metric_codes, values, diastolic):
+    metric_codes = np.asarray(metric_codes, dtype=np.int8)
+    values = np.asarray(values, dtype=np.float64)
+    diastolic = np.asarray(diastolic, dtype=np.float64)
+    lows = np.array([HEALTH_METRIC_RANGES[metric]['low'] for metric in METRICS], dtype=np.float64)
+    highs = np.array([HEALTH_METRIC_RANGES[metric]['high'] for metric in METRICS], dtype=np.float64)
+    is_blood_pressure = metric_codes == METRIC_CODES['blood_pressure']
+    # NaN diastolic values (non blood pressure rows) compare False, so they never flag
+    too_low = (values < lows[metric_codes]) | (is_blood_pressure & (diastolic < DIASTOLIC_RANGE['low']))
+    too_high = (values > highs[metric_codes]) | (is_blood_pressure & (diastolic > DIASTOLIC_RANGE['high']))
+    directions = np.where(too_high, 'high', np.where(too_low, 'low', ''))
+    return [(int(index), str(directions[index])) for index in np.flatnonzero(too_low | too_high)]
+
+def _directions_python(metric_codes, values, diastolic):
+    flagged = []
+    for index, (code, value, diastolic_value) in enumerate(zip(metric_codes, values, diastolic)):
+        ranges = HEALTH_METRIC_RANGES[METRICS[code]]
+        is_blood_pressure = METRICS[code] == 'blood_pressure'
+        if value > ranges['high'] or (is_blood_pressure and diastolic_value > DIASTOLIC_RANGE['high']):
+            flagged.append((index, 'high'))
+        elif value < ranges['low'] or (is_blood_pressure and diastolic_value < DIASTOLIC_RANGE['low']):
+            flagged.append((index, 'low'))
+    return flagged
+
+def detect_abnormal_readings(elderly_user_ids, since=None):
+    """
+    Return {elderly_user_id: [flag, ...]} for readings outside the normal ranges, newest first.
+
+    All readings for the given users in the window are loaded once and range-checked
+    together as arrays, so the cost is one query plus a single vectorized pass.
+    """
+    since = since or timezone.now() - DEFAULT_WINDOW
+    flags = {elderly_user_id: [] for elderly_user_id in elderly_user_ids}
+    rows = list(
+        VitalReading.objects.filter(elderly_user_id__in=elderly_user_ids, measured_at__gte=since)
+        .order_by('-measured_at')
+        .values_list('elderly_user_id', 'metric', 'value', 'diastolic', 'measured_at')
+    )
+    if not rows:
+        return flags
+    user_ids, metrics, values, diastolic, measured_at = zip(*rows)
+    metric_codes = [METRIC_CODES[metric] for metric in metrics]
+    diastolic = [float('nan') if value is None else value for value in diastolic]
+    directions = _directions_numpy if np is not None else _directions_python
+    for index, direction in directions(metric_codes, values, diastolic):
+        flags[user_ids[index]].append(_flag(
+            user_ids[index], metrics[index], values[index], diastolic[index], measured_at[index], direction
+        ))
+    return flags
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+from .models import Caregiver, CaregiverAssignment, EmergencyNotification
+
+logger = logging.getLogger(__name__)
+
+# Each process keeps its own routing map. Signals keep it current for changes made in
+# this process; a full rebuild in the background picks up changes made by other workers,
+# and a user with no route yet is looked up in the database before dispatching.
+ROUTES_MAX_AGE = 300
+
+class EmergencyDispatcher:
+    """
+    Route emergencies to the caregivers assigned to an elderly user.
+
+    Assignments and duty status are held in memory, so dispatching an emergency costs a
+    dictionary lookup plus the EmergencyNotification insert.
+    """
+
+    def __init__(self, max_age=ROUTES_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._routes = None  # elderly_user_id -> caregiver ids in assignment order
+        self._on_duty = {}  # caregiver_id -> on_duty flag
+        self._loaded_at = 0.0
+        self._rebuilding = False
+
+    def _build(self):
+        routes = {}
+        for elderly_user_id, caregiver_id in (
+            CaregiverAssignment.objects.order_by('assigned_at', 'id').values_list('elderly_user_id', 'caregiver_id')
+        ):
+            routes.setdefault(elderly_user_id, []).append(caregiver_id)
+        on_duty = dict(Caregiver.objects.values_list('id', 'on_duty'))
+        return routes, on_duty
+
+    def _install(self, routes, on_duty):
+        with self._lock:
+            self._routes, self._on_duty = routes, on_duty
+            self._loaded_at = time.monotonic()
+            self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        try:
+            self._install(*self._build())
+        except Exception:
+            # The current map keeps serving; the next stale lookup tries again
+            logger.exception('Rebuilding the emergency routes failed')
+            with self._lock:
+                self._rebuilding = False
+        finally:
+            close_old_connections()
+
+    def _get_routes(self):
+        if self._routes is None:
+            self._install(*self._build())
+        elif time.monotonic() - self._loaded_at > self.max_age:
+            with self._lock:
+                start = not self._rebuilding
+                self._rebuilding = True
+            if start:
+                # Keep serving the current map while the fresh one loads
+                threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+        return self._routes
+
+    def invalidate(self):
+        with self._lock:
+            self._routes = None
+
+    def _load_route(self, elderly_user_id):
+        return list(
+            CaregiverAssignment.objects.filter(elderly_user_id=elderly_user_id)
+            .order_by('assigned_at', 'id')
+            .values_list('caregiver_id', flat=True)
+        )
+
+    def refresh_elderly_user(self, elderly_user_id):
+        if self._routes is None:
+            return
+        caregiver_ids = self._load_route(elderly_user_id)
+        with self._lock:
+            if self._routes is None:
+                return
+            if caregiver_ids:
+                self._routes[elderly_user_id] = caregiver_ids
+            else:
+                self._routes.pop(elderly_user_id, None)
+
+    def set_on_duty(self, caregiver_id, on_duty):
+        with self._lock:
+            self._on_duty[caregiver_id] = on_duty
+
+    def caregivers_for(self, elderly_user_id):
+        """Assigned caregiver ids in dispatch order: on-duty first, then off-duty, each by assignment age."""
+        caregiver_ids = self._get_routes().get(elderly_user_id)
+        if caregiver_ids is None:
+            # Possibly assigned by another worker since the map was built
+            caregiver_ids = self._load_route(elderly_user_id)
+            if caregiver_ids:
+                with self._lock:
+                    if self._routes is not None:
+                        self._routes[elderly_user_id] = caregiver_ids
+        on_duty = self._on_duty
+        return (
+            [caregiver_id for caregiver_id in caregiver_ids if on_duty.get(caregiver_id, True)]
+            + [caregiver_id for caregiver_id in caregiver_ids if not on_duty.get(caregiver_id, True)]
+        )
+
+    def dispatch(self, elderly_user):
+        caregiver_ids = self.caregivers_for(elderly_user.id)
+        # Unassigned users still get their alert recorded so it is not lost
+        return EmergencyNotification.objects.create(
+            elderly_user=elderly_user,
+            caregiver_id=caregiver_ids[0] if caregiver_ids else None,
+            status='sent'
+        )
+
+dispatcher = EmergencyDispatcher()
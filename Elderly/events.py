@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+
+from .models import EmergencyNotification, FeedbackNotification
+
+# Seconds between the shared per-process catch-up query and between keep-alive comments
+POLL_INTERVAL = 2
+KEEPALIVE_INTERVAL = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+SEEN_EVENTS_LIMIT = 10000
+# Replays reach this far back before the client's cursor: a row inserted before the cursor but
+# committed after it would otherwise never be sent. The page drops the events it already shows.
+REPLAY_OVERLAP = timedelta(seconds=5)
+
+logger = logging.getLogger(__name__)
+
+def emergency_event(notification_id, elderly_user_id, status, timestamp):
+    return {
+        'type': 'emergency',
+        'id': notification_id,
+        'elderly_user_id': elderly_user_id,
+        'status': status,
+        'timestamp': timestamp.isoformat(),
+        'cursor': int(timestamp.timestamp() * 1000),
+    }
+
+def feedback_event(feedback_id, elderly_user_id, message, status, timestamp):
+    return {
+        'type': 'feedback',
+        'id': feedback_id,
+        'elderly_user_id': elderly_user_id,
+        'message': message,
+        'status': status,
+        'timestamp': timestamp.isoformat(),
+        'cursor': int(timestamp.timestamp() * 1000),
+    }
+
+def format_sse(event):
+    return f"id: {event['cursor']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+def events_since(elderly_user_ids, since, emergency_after_id=0, feedback_after_id=0):
+    """Load emergencies and feedback newer than `since` (or the given ids), oldest first."""
+    emergencies = EmergencyNotification.objects.filter(elderly_user_id__in=elderly_user_ids, id__gt=emergency_after_id)
+    feedback = FeedbackNotification.objects.filter(
+        notification__elderly_user_id__in=elderly_user_ids, id__gt=feedback_after_id
+    )
+    if since is not None:
+        emergencies = emergencies.filter(timestamp__gt=since)
+        feedback = feedback.filter(timestamp__gt=since)
+    events = [
+        emergency_event(*row)
+        for row in emergencies.values_list('id', 'elderly_user_id', 'status', 'timestamp')
+    ] + [
+        feedback_event(*row)
+        for row in feedback.values_list('id', 'notification__elderly_user_id', 'message', 'status', 'timestamp')
+    ]
+    events.sort(key=lambda event: event['cursor'])
+    return events
+
+class Subscription:
+    def __init__(self, elderly_user_ids):
+        self.elderly_user_ids = frozenset(elderly_user_ids)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass  # A stalled client reconnects with Last-Event-ID and replays from the database
+
+class EventBroker:
+    """
+    In-process fan-out of emergency and feedback events to connected SSE clients.
+
+    Events raised in this process are pushed immediately from model signals. A single
+    poller per process picks up rows written by other workers, so the database is
+    queried once per interval however many clients are connected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # elderly_user_id -> set of Subscription
+        self._seen = OrderedDict()
+        self._poller = None
+        self._last_ids = None
+
+    def subscribe(self, elderly_user_ids):
+        subscription = Subscription(elderly_user_ids)
+        with self._lock:
+            for elderly_user_id in subscription.elderly_user_ids:
+                self._subscribers.setdefault(elderly_user_id, set()).add(subscription)
+            if self._poller is None or self._poller.done() or self._poller.get_loop() is not subscription.loop:
+                self._poller = subscription.loop.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for elderly_user_id in subscription.elderly_user_ids:
+                subscribers = self._subscribers.get(elderly_user_id)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[elderly_user_id]
+
+    def publish(self, event):
+        """Deliver an event to subscribers of its elderly user; safe to call from any thread."""
+        key = (event['type'], event['id'])
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen[key] = True
+            if len(self._seen) > SEEN_EVENTS_LIMIT:
+                self._seen.popitem(last=False)
+            subscribers = list(self._subscribers.get(event['elderly_user_id'], ()))
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+    def _latest_ids(self):
+        return (
+            EmergencyNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+            FeedbackNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+        )
+
+    def _catch_up(self, elderly_user_ids):
+        emergency_after_id, feedback_after_id = self._last_ids
+        events = events_since(elderly_user_ids, None, emergency_after_id, feedback_after_id)
+        for event in events:
+            if event['type'] == 'emergency':
+                emergency_after_id = max(emergency_after_id, event['id'])
+            else:
+                feedback_after_id = max(feedback_after_id, event['id'])
+        self._last_ids = (emergency_after_id, feedback_after_id)
+        return events
+
+    async def _poll(self):
+        if self._last_ids is None:
+            self._last_ids = await sync_to_async(self._latest_ids)()
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            with self._lock:
+                elderly_user_ids = list(self._subscribers)
+                if not elderly_user_ids:
+                    # Decided under the lock so a new subscriber always finds a live poller or none
+                    self._poller = None
+                    self._last_ids = None
+                    return
+            try:
+                events = await sync_to_async(self._catch_up)(elderly_user_ids)
+            except Exception:
+                logger.exception('Emergency event catch-up query failed')
+                continue
+            for event in events:
+                self.publish(event)
+
+broker = EventBroker()
@@ -0,0 +1,111 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Billing, EmergencyNotification, ServiceRequest
+
+EXPORT_CHUNK_SIZE = 2000
+
+def person_name(person):
+    if person is None:
+        return ''
+    return f'{person.first_name or ""} {person.last_name or ""}'.strip()
+
+# name -> (queryset with its joins, status field, [(column, value getter)])
+EXPORTS = {
+    'service_requests': (
+        lambda: ServiceRequest.objects.select_related('elderly_user', 'doctor'),
+        'status',
+        [
+            ('id', lambda row: row.id),
+            ('timestamp', lambda row: row.timestamp),
+            ('status', lambda row: row.status),
+            ('specialization', lambda row: row.specialization),
+            ('elderly_user_id', lambda row: row.elderly_user_id),
+            ('elderly_user', lambda row: person_name(row.elderly_user)),
+            ('doctor_id', lambda row: row.doctor_id),
+            ('doctor', lambda row: person_name(row.doctor)),
+        ],
+    ),
+    'billing': (
+        lambda: Billing.objects.select_related('request__elderly_user', 'request__doctor'),
+        'payment_status',
+        [
+            ('id', lambda row: row.id),
+            ('timestamp', lambda row: row.timestamp),
+            ('payment_status', lambda row: row.payment_status),
+            ('service_cost', lambda row: row.service_cost),
+            ('paybill', lambda row: row.paybill),
+            ('account_number', lambda row: row.account_number),
+            ('request_id', lambda row: row.request_id),
+            ('elderly_user', lambda row: person_name(row.request.elderly_user)),
+            ('doctor', lambda row: person_name(row.request.doctor)),
+        ],
+    ),
+    'emergencies': (
+        lambda: EmergencyNotification.objects.select_related('elderly_user', 'caregiver'),
+        'status',
+        [
+            ('id', lambda row: row.id),
+            ('timestamp', lambda row: row.timestamp),
+            ('status', lambda row: row.status),
+            ('elderly_user_id', lambda row: row.elderly_user_id),
+            ('elderly_user', lambda row: person_name(row.elderly_user)),
+            ('caregiver_id', lambda row: row.caregiver_id),
+            ('caregiver', lambda row: person_name(row.caregiver)),
+        ],
+    ),
+}
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+def parse_export_date(value):
+    """A YYYY-MM-DD date from a filter; raises ValueError for anything else."""
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Invalid date {value!r}; use YYYY-MM-DD.')
+    return day
+
+def export_queryset(name, start=None, end=None, status=None):
+    """Rows of one export created on or after `start` and on or before `end` (dates), oldest first."""
+    build_queryset, status_field, _ = EXPORTS[name]
+    queryset = build_queryset()
+    if start:
+        queryset = queryset.filter(timestamp__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    if end:
+        queryset = queryset.filter(timestamp__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+    if status:
+        queryset = queryset.filter(**{status_field: status})
+    return queryset.order_by('timestamp', 'id')
+
+def export_rows(name, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    columns = EXPORTS[name][2]
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [value(row) for _, value in columns]
+
+class Echo:
+    """File-like object whose write() hands the line back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+def stream_csv(name, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in EXPORTS[name][2]])
+    for values in export_rows(name, queryset, chunk_size):
+        yield writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in values])
+
+def stream_ndjson(name, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    columns = [column for column, _ in EXPORTS[name][2]]
+    for values in export_rows(name, queryset, chunk_size):
+        yield json.dumps(dict(zip(columns, values)), cls=DjangoJSONEncoder) + '\n'
+
+def stream_export(name, export_format, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format == 'ndjson':
+        return stream_ndjson(name, queryset, chunk_size)
+    return stream_csv(name, queryset, chunk_size)
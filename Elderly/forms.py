@@ -1,7 +1,10 @@
 from django import forms
+from django.db import transaction
 from .models import (
-    CustomUser, ElderlyUser, Caregiver, Doctor, Admin, HealthRecord, Observation, Prescription, Billing
+    CustomUser, ElderlyUser, Caregiver, Doctor, DoctorAvailability, Admin, HealthRecord, Observation, Prescription,
+    Billing, VitalReading
 )
+from .vitals import VITAL_RANGES, apply_latest_readings, parse_blood_pressure, readings_from_health_record
 
 class UserRegistrationForm(forms.ModelForm):
     email = forms.EmailField(required=True)
@@ -74,6 +77,40 @@ class HealthRecordForm(forms.ModelForm):
             'allergies': forms.Textarea(attrs={'rows': 4}),
         }
 
+    def clean_blood_pressure(self):
+        blood_pressure = self.cleaned_data.get('blood_pressure')
+        if blood_pressure:
+            try:
+                systolic, diastolic = parse_blood_pressure(blood_pressure)
+            except ValueError as exc:
+                raise forms.ValidationError(str(exc))
+            blood_pressure = f'{systolic}/{diastolic}'
+        return blood_pressure
+
+    def clean_vital(self, metric):
+        value = self.cleaned_data.get(metric)
+        low, high = VITAL_RANGES[metric]
+        if value is not None and not low <= value <= high:
+            raise forms.ValidationError(f'Enter a value between {low} and {high}.')
+        return value
+
+    def clean_heart_rate(self):
+        return self.clean_vital('heart_rate')
+
+    def clean_sugar_levels(self):
+        return self.clean_vital('sugar_levels')
+
+    def save(self, commit=True):
+        health_record = super().save(commit=False)
+        # Every vitals change is appended to the VitalReading history as well as cached here
+        readings = readings_from_health_record(health_record, self.changed_data)
+        apply_latest_readings(health_record, readings)
+        if commit:
+            with transaction.atomic():
+                health_record.save()
+                VitalReading.objects.bulk_create(readings)
+        return health_record
+
 class ObservationForm(forms.ModelForm):
     class Meta:
         model = Observation
@@ -101,4 +138,21 @@ class BillingForm(forms.ModelForm):
             'service_cost': forms.NumberInput(attrs={'step': '0.01'}),
             'paybill': forms.TextInput(attrs={'placeholder': 'Paybill Number'}),
             'account_number': forms.TextInput(attrs={'placeholder': 'Account Number'}),
-        }
\ No newline at end of file
+        }
+
+class DoctorAvailabilityForm(forms.ModelForm):
+    class Meta:
+        model = DoctorAvailability
+        fields = ['starts_at', 'ends_at']
+        widgets = {
+            'starts_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'ends_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        starts_at = cleaned_data.get('starts_at')
+        ends_at = cleaned_data.get('ends_at')
+        if starts_at and ends_at and ends_at <= starts_at:
+            raise forms.ValidationError("The window must end after it starts.")
+        return cleaned_data
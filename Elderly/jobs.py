@@ -0,0 +1,101 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 3600
+# Jobs still running after this long are assumed lost with their worker and queued again
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+def job(name):
+    """Register a function as the handler for jobs with this name."""
+    def register(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return register
+
+def enqueue(name, max_attempts=5, run_after=None, **payload):
+    """
+    Queue a job for the worker.
+
+    The row is written in the caller's transaction, so a job is only ever visible
+    together with the data it refers to.
+    """
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter: roughly 5s, 10s, 20s, ... capped at an hour."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def claim_jobs(worker_id, limit):
+    """
+    Atomically take up to `limit` due jobs for this worker.
+
+    On backends with SKIP LOCKED, rows locked by other claimers are skipped instead of
+    waited on. Elsewhere the conditional UPDATE on status='queued' ensures each job is
+    handed to exactly one worker even if two of them select the same candidates.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        job_ids = list(candidates.values_list('id', flat=True)[:limit])
+        if not job_ids:
+            return []
+        Job.objects.filter(id__in=job_ids, status='queued').update(
+            status='running', locked_at=now, locked_by=worker_id, attempts=F('attempts') + 1,
+        )
+        return list(Job.objects.filter(id__in=job_ids, status='running', locked_by=worker_id, locked_at=now))
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    return Job.objects.filter(status='running', locked_at__lt=timezone.now() - timeout).update(
+        status='queued', locked_at=None, locked_by=None,
+    )
+
+def run_job(claimed_job):
+    # A job requeued as stale may have been claimed again, even by this same worker; only the
+    # claim that started this run, identified by its lock time and attempt, records the outcome
+    owned = Job.objects.filter(
+        id=claimed_job.id, status='running', locked_by=claimed_job.locked_by, locked_at=claimed_job.locked_at,
+        attempts=claimed_job.attempts,
+    )
+    handler = JOB_HANDLERS.get(claimed_job.name)
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for job {claimed_job.name!r}')
+        handler(**claimed_job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed on attempt %s', claimed_job.id, claimed_job.name, claimed_job.attempts)
+        if claimed_job.attempts >= claimed_job.max_attempts:
+            updated = owned.update(status='failed', last_error=error, locked_at=None, finished_at=timezone.now())
+        else:
+            updated = owned.update(
+                status='queued', last_error=error, locked_at=None, locked_by=None,
+                run_after=timezone.now() + backoff_delay(claimed_job.attempts),
+            )
+        if not updated:
+            logger.warning('Job %s (%s) was reclaimed while running; its failure was not recorded',
+                           claimed_job.id, claimed_job.name)
+        return False
+    if not owned.update(status='done', locked_at=None, finished_at=timezone.now()):
+        logger.warning('Job %s (%s) was reclaimed while running; its result was not recorded',
+                       claimed_job.id, claimed_job.name)
+    return True
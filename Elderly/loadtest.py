@@ -0,0 +1,185 @@
+import math
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from .models import Admin, CaregiverAssignment, CustomUser, Doctor, ElderlyUser, ServiceRequest
+
+# Read-only pages each role browses; views that change data on GET are left out so runs stay comparable
+ROLE_SCENARIOS = {
+    'elderly': (
+        'dashboard', 'profile', 'service_booking', 'health_records', 'prescriptions', 'billing_section',
+        'medication_reminders', 'notifications',
+    ),
+    'caregiver': (
+        'dashboard', 'monitoring_tools', 'medication_management', 'appointment_scheduling', 'assigned_elderly_users',
+        'emergency_alerts', 'notifications', 'elderly_profile', 'available_slots',
+    ),
+    'doctor': (
+        'doctor_dashboard', 'view_requests', 'doctor_availability', 'elderly_user_details', 'access_health_records',
+    ),
+    'admin': (
+        'admin_dashboard', 'manage_users', 'verify_doctor_list', 'generate_reports', 'assign_caregiver_to_elderly',
+    ),
+}
+# URL arguments and query parameters filled in from the signed-in user's context
+URL_ARGUMENTS = {
+    'elderly_profile': ('elderly_user_id',),
+    'elderly_user_details': ('elderly_user_id',),
+    'access_health_records': ('elderly_user_id',),
+}
+QUERY_PARAMETERS = {
+    'available_slots': ('specialization',),
+}
+LOAD_USERS_PER_ROLE = 200
+
+def load_users(role, rng, limit=LOAD_USERS_PER_ROLE):
+    """(user, context) pairs for signed-in clients of one role; the context fills URL arguments."""
+    if role == 'elderly':
+        rows = [
+            (user_id, {'elderly_user_id': elderly_user_id})
+            for user_id, elderly_user_id in ElderlyUser.objects.exclude(first_name__isnull=True).exclude(first_name='')
+            .order_by('id').values_list('user_id', 'id')
+        ]
+    elif role == 'caregiver':
+        first_assignment = {}
+        for caregiver_user_id, elderly_user_id in (
+            CaregiverAssignment.objects.filter(caregiver__first_name__isnull=False)
+            .order_by('caregiver_id', 'assigned_at', 'id').values_list('caregiver__user_id', 'elderly_user_id')
+        ):
+            first_assignment.setdefault(caregiver_user_id, elderly_user_id)
+        specializations = sorted({value for value, _ in Doctor.SPECIALIZATION_CHOICES})
+        rows = [
+            (user_id, {'elderly_user_id': elderly_user_id, 'specialization': specializations[user_id % len(specializations)]})
+            for user_id, elderly_user_id in first_assignment.items()
+        ]
+    elif role == 'doctor':
+        # Doctors only see the details of patients whose request they have accepted
+        patient = dict(
+            ServiceRequest.objects.filter(doctor__isnull=False, status='accepted').order_by('doctor_id', 'id')
+            .values_list('doctor_id', 'elderly_user_id')
+        )
+        rows = [
+            (user_id, {'elderly_user_id': patient[doctor_id]})
+            for doctor_id, user_id in Doctor.objects.filter(verified_status=True, first_name__isnull=False)
+            .order_by('id').values_list('id', 'user_id')
+            if doctor_id in patient
+        ]
+    else:
+        rows = [(user_id, {}) for user_id in Admin.objects.exclude(permissions={}).order_by('id').values_list('user_id', flat=True)]
+    rows = rng.sample(rows, min(limit, len(rows)))
+    users = CustomUser.objects.in_bulk([user_id for user_id, _ in rows])
+    return [(users[user_id], context) for user_id, context in rows]
+
+def scenario_url(url_name, context):
+    url = reverse(f'elderly:{url_name}', kwargs={name: context[name] for name in URL_ARGUMENTS.get(url_name, ())})
+    if url_name in QUERY_PARAMETERS:
+        url += '?' + urlencode({name: context[name] for name in QUERY_PARAMETERS[url_name]})
+    return url
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+def summarize(samples, elapsed):
+    """Per-URL-name latency percentiles (ms), throughput and error counts, as sorted plain data."""
+    by_name = {}
+    for url_name, latency, status_code, queries in samples:
+        by_name.setdefault(url_name, []).append((latency, status_code, queries))
+    results = {}
+    for url_name, rows in sorted(by_name.items()):
+        latencies = sorted(latency * 1000 for latency, _, _ in rows)
+        queries = [count for _, _, count in rows if count is not None]
+        results[url_name] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, status_code, _ in rows if status_code >= 500),
+            'throughput_rps': round(len(rows) / elapsed, 2) if elapsed else 0,
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_queries': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    return results
+
+def run_load(roles, clients=8, duration=30.0, requests_per_client=None, warmup=5, seed=0, host='localhost'):
+    """
+    Drive the role scenarios with concurrent in-process clients and summarise the latencies.
+
+    Clients are spread over `roles` in turn, each signed in as a different user browsing
+    pages in a seeded random order. A run stops after `requests_per_client` requests per
+    client when given, otherwise after `duration` seconds.
+    """
+    rng = random.Random(seed)
+    users = {role: load_users(role, rng) for role in roles}
+    missing = [role for role, candidates in users.items() if not candidates]
+    if missing:
+        raise ValueError(f'No users with a completed profile for role(s): {", ".join(missing)}')
+    samples = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(clients + 1)
+
+    def worker(index):
+        role = roles[index % len(roles)]
+        user, context = users[role][(index // len(roles)) % len(users[role])]
+        client_rng = random.Random(f'{seed}-{index}')
+        try:
+            client = Client(SERVER_NAME=host, raise_request_exception=False)
+            client.force_login(user)
+            urls = [(url_name, scenario_url(url_name, context)) for url_name in ROLE_SCENARIOS[role]]
+            for _ in range(warmup):
+                client.get(client_rng.choice(urls)[1])
+            start_barrier.wait()
+        except threading.BrokenBarrierError:
+            return
+        except BaseException:
+            # Release the other clients instead of leaving them waiting for this one
+            start_barrier.abort()
+            connection.close()
+            raise
+        deadline = time.perf_counter() + duration
+        try:
+            local, sent = [], 0
+            while (sent < requests_per_client) if requests_per_client else (time.perf_counter() < deadline):
+                url_name, url = client_rng.choice(urls)
+                started = time.perf_counter()
+                response = client.get(url)
+                latency = time.perf_counter() - started
+                queries = response.get('X-DB-Query-Count')
+                local.append((url_name, latency, response.status_code, int(queries) if queries else None))
+                sent += 1
+            with lock:
+                samples.extend(local)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise RuntimeError('A load client failed while warming up.')
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'config': {
+            'roles': list(roles), 'clients': clients, 'duration': duration,
+            'requests_per_client': requests_per_client, 'warmup': warmup, 'seed': seed,
+        },
+        'total': {
+            'requests': len(samples),
+            'errors': sum(1 for _, _, status_code, _ in samples if status_code >= 500),
+            'elapsed_s': round(elapsed, 2),
+            'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+        },
+        'urls': summarize(samples, elapsed),
+    }
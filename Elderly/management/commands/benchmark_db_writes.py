@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from ElderCare_project.database_url import SQLITE_PRAGMAS
+
+SCHEMA = (
+    'CREATE TABLE emergency (id INTEGER PRIMARY KEY, elderly_user_id INTEGER NOT NULL, '
+    'status TEXT NOT NULL, timestamp REAL NOT NULL)'
+)
+
+
+def run_profile(path, threads, writes, tuned):
+    """Each thread plays a worker handling emergency presses: read the user's open alerts, then insert one."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def connect():
+        # The default profile mirrors Django's old settings: default journaling and timeout,
+        # deferred transactions and a new connection per request
+        connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if tuned:
+            for pragma in SQLITE_PRAGMAS:
+                connection.execute(pragma)
+        return connection
+
+    def worker(worker_id):
+        connection = connect() if tuned else None
+        for i in range(writes):
+            started = time.perf_counter()
+            conn = connection or connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE' if tuned else 'BEGIN')
+                conn.execute("SELECT COUNT(*) FROM emergency WHERE elderly_user_id = ? AND status = 'sent'", (worker_id,))
+                conn.execute(
+                    "INSERT INTO emergency (elderly_user_id, status, timestamp) VALUES (?, 'sent', ?)",
+                    (worker_id, time.time()),
+                )
+                conn.execute('COMMIT')
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+            except sqlite3.OperationalError as error:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                with lock:
+                    errors.append(str(error))
+            finally:
+                if connection is None:
+                    conn.close()
+        if connection is not None:
+            connection.close()
+
+    setup = sqlite3.connect(path)
+    setup.execute(SCHEMA)
+    setup.commit()
+    setup.close()
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'committed': len(latencies),
+        'errors': len(errors),
+        'writes_per_second': len(latencies) / elapsed if elapsed else 0,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent SQLite write throughput with the default settings and the tuned WAL profile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers.')
+        parser.add_argument('--writes', type=int, default=500, help='Transactions per writer.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, tuned in (('default', False), ('tuned', True)):
+                path = os.path.join(directory, f'{name}.sqlite3')
+                result = run_profile(path, options['threads'], options['writes'], tuned)
+                self.stdout.write(
+                    f"{name:>8}: {result['committed']} committed, {result['errors']} failed, "
+                    f"{result['writes_per_second']:.0f} writes/s, p99 {result['p99_ms']:.1f} ms"
+                )
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Elderly.exports import (
+    EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORTS, export_queryset, parse_export_date, stream_export,
+)
+
+
+class Command(BaseCommand):
+    help = 'Stream service requests, billing or emergencies as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS), help='Dataset to export.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--from', dest='start', help='Only rows created on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='end', help='Only rows created on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--status', help='Only rows with this status.')
+        parser.add_argument('--output', help='File to write; defaults to standard output.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows fetched per query.')
+
+    def handle(self, *args, **options):
+        try:
+            start = parse_export_date(options['start'])
+            end = parse_export_date(options['end'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        queryset = export_queryset(options['name'], start, end, options['status'])
+        output = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in stream_export(options['name'], options['format'], queryset, options['chunk_size']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
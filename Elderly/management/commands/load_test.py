@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Elderly.loadtest import ROLE_SCENARIOS, run_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the app with concurrent signed-in clients per role and report p50/p95/p99 latency '
+        'and throughput per URL name as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roles', default=','.join(ROLE_SCENARIOS), help='Comma-separated roles to simulate.')
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent clients, spread over the roles.')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run for.')
+        parser.add_argument('--requests', type=int, help='Requests per client; overrides --duration.')
+        parser.add_argument('--warmup', type=int, default=5, help='Unrecorded requests per client first.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the users and page order.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        roles = [role.strip() for role in options['roles'].split(',') if role.strip()]
+        unknown = [role for role in roles if role not in ROLE_SCENARIOS]
+        if not roles or unknown:
+            raise CommandError(f'Unknown role(s): {", ".join(unknown)}; choose from {", ".join(ROLE_SCENARIOS)}.')
+        if options['clients'] < 1:
+            raise CommandError('--clients must be at least 1.')
+        try:
+            report = run_load(
+                roles, clients=options['clients'], duration=options['duration'],
+                requests_per_client=options['requests'], warmup=options['warmup'], seed=options['seed'],
+                host=options['host'],
+            )
+        except ValueError as error:
+            raise CommandError(f'{error}. Run seed_population first.')
+        # Stable key order so reports from two runs diff cleanly
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+            total = report['total']
+            self.stdout.write(self.style.SUCCESS(
+                f"{total['requests']} requests, {total['errors']} errors, {total['throughput_rps']} req/s; "
+                f"report written to {options['output']}."
+            ))
+        else:
+            self.stdout.write(output)
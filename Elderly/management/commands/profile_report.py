@@ -0,0 +1,42 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Elderly.profiling import PROFILE_SORT_KEYS, hot_functions, load_captures, request_summary, top_allocations
+
+
+class Command(BaseCommand):
+    help = 'Aggregate the captures written by ProfilingMiddleware into ranked hot-function and allocation reports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PROFILING_DIR, help='Directory holding the captures.')
+        parser.add_argument('--url-name', help='Only captures of this URL name, e.g. elderly:dashboard.')
+        parser.add_argument('--role', help='Only captures of requests made by this role.')
+        parser.add_argument('--sort', choices=PROFILE_SORT_KEYS, default='cumulative', help='Rank functions by.')
+        parser.add_argument('--limit', type=int, default=30, help='Functions and allocation sites to list.')
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['dir']):
+            raise CommandError(f"No capture directory at {options['dir']}.")
+        captures = load_captures(options['dir'], options['url_name'], options['role'])
+        if not captures:
+            raise CommandError('No captures match.')
+        summaries = [summary for _, summary in captures]
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Requests (slowest total first)'))
+        for row in request_summary(summaries):
+            self.stdout.write(
+                f"{row['url_name']:<40} {row['role']:<10} {row['captures']:>5} captures  "
+                f"mean {row['mean_ms']:>9.2f} ms  max {row['max_ms']:>9.2f} ms  "
+                f"peak {row['max_peak_memory_kb']:>9.1f} KiB"
+            )
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Hot functions by {options['sort']}"))
+        self.stdout.write(hot_functions([path for path, _ in captures], options['sort'], options['limit']))
+        self.stdout.write(self.style.MIGRATE_HEADING('Allocation sites (KiB still held at the end of the view)'))
+        for allocation in top_allocations(summaries, options['limit']):
+            self.stdout.write(
+                f"{allocation['size_kb']:>10.1f} KiB {allocation['count']:>8} blocks "
+                f"{allocation['captures']:>5} captures  {allocation['location']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Aggregated {len(captures)} captures.'))
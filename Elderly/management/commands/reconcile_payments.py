@@ -0,0 +1,52 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Elderly.payments import mark_bills_paid, match_statement, pending_bill_index
+
+
+class Command(BaseCommand):
+    help = 'Match a paybill statement CSV to pending bills and mark the matched bills paid.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Path to the statement CSV file.')
+        parser.add_argument('--paybill', help='Only match bills issued under this paybill number.')
+        parser.add_argument('--unmatched', help='Write unmatched statement lines to this CSV file.')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without updating any bills.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        index = pending_bill_index(options['paybill'])
+        try:
+            with open(options['statement'], newline='', encoding='utf-8-sig') as statement:
+                matches, unmatched = match_statement(statement, index)
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+        updated, skipped = (0, []) if options['dry_run'] else mark_bills_paid(matches)
+        if skipped:
+            unmatched.extend(
+                (line_number, receipt, account, amount, 'bill already paid')
+                for _, line_number, receipt, account, amount in skipped
+            )
+            unmatched.sort(key=lambda line: line[0])
+
+        if options['unmatched']:
+            with open(options['unmatched'], 'w', newline='') as report:
+                writer = csv.writer(report)
+                writer.writerow(['line', 'receipt', 'account', 'amount', 'reason'])
+                writer.writerows(unmatched)
+        else:
+            for line_number, receipt, account, amount, reason in unmatched[:20]:
+                self.stdout.write(f'Line {line_number}: {receipt} {account} {amount} - {reason}')
+            if len(unmatched) > 20:
+                self.stdout.write(f'... {len(unmatched) - 20} more unmatched lines (use --unmatched to save them all)')
+
+        summary = (
+            f'{len(matches)} lines matched, {updated} bills marked paid, {len(skipped)} already paid, '
+            f'{len(unmatched)} unmatched '
+            f'in {time.monotonic() - started:.1f}s.'
+        )
+        if options['dry_run']:
+            summary += ' Dry run: no bills were updated.'
+        self.stdout.write(self.style.SUCCESS(summary))
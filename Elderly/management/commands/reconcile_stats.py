@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from Elderly.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the platform statistics counters from the service request and emergency tables.'
+
+    def handle(self, *args, **options):
+        count = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} statistics counters.'))
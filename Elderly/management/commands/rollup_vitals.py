@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from Elderly.rollups import ROLLUP_CHUNK_SIZE, rollup_vitals
+
+
+class Command(BaseCommand):
+    help = 'Fold new vital readings into the hourly and daily rollups. Safe to run repeatedly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=ROLLUP_CHUNK_SIZE,
+            help='Number of readings merged per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        processed = rollup_vitals(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {processed} readings.'))
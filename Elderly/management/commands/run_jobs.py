@@ -0,0 +1,52 @@
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from Elderly import tasks  # noqa: F401 - registers the job handlers
+from Elderly.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+def run_in_thread(claimed_job):
+    try:
+        return run_job(claimed_job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs in a thread pool, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Number of worker threads.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no jobs are due instead of polling.')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        succeeded = failed = 0
+        last_requeue = 0.0
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            try:
+                while True:
+                    if time.monotonic() - last_requeue > 60:
+                        requeue_stale_jobs()
+                        last_requeue = time.monotonic()
+                    claimed = claim_jobs(worker_id, limit=threads * 2)
+                    if not claimed:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    for ok in executor.map(run_in_thread, claimed):
+                        if ok:
+                            succeeded += 1
+                        else:
+                            failed += 1
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping worker...')
+        self.stdout.write(self.style.SUCCESS(f'Jobs succeeded: {succeeded}, failed attempts: {failed}.'))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Elderly.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = 'Emit medication reminders as prescription doses fall due.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tick', type=float, default=5.0, help='Seconds between scheduler ticks.')
+        parser.add_argument('--once', action='store_true', help='Emit everything currently due and exit.')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+        try:
+            while True:
+                emitted = scheduler.tick()
+                if emitted:
+                    self.stdout.write(f'Emitted {emitted} medication reminders.')
+                if options['once']:
+                    break
+                time.sleep(options['tick'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping scheduler...')
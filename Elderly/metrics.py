@@ -0,0 +1,197 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Job, ServiceRequest
+from .stats import stat_totals
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_FLUSH_INTERVAL = 1.0
+
+# name -> (type, help, label names, buckets for histograms)
+METRICS = {
+    'elderly_http_requests_total': (
+        'counter', 'Requests handled, by view, role and status code.', ('view', 'role', 'status'), None,
+    ),
+    'elderly_http_request_duration_seconds': (
+        'histogram', 'Request latency, by view and role.', ('view', 'role'), LATENCY_BUCKETS,
+    ),
+    'elderly_db_query_duration_seconds': (
+        'histogram', 'Database time spent per request, by view.', ('view',), LATENCY_BUCKETS,
+    ),
+    'elderly_db_queries_total': (
+        'counter', 'Database queries run, by view.', ('view',), None,
+    ),
+}
+
+class MetricsStore:
+    """
+    Counters and histograms of this process, shared with other workers through files.
+
+    Each process keeps its own values in memory, and a background thread rewrites its file
+    in `directory` every `flush_interval` seconds while they change, and once more at exit.
+    A scrape adds up the files of every process that has run, so totals keep growing across
+    workers and restarts. Without a directory only this process is reported.
+    """
+
+    def __init__(self, directory=None, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # Held across a whole flush so an older copy never replaces a newer one
+        self._flush_lock = threading.Lock()
+        self._pid = None
+
+    def _check_process(self):
+        # A worker forked after import starts from zero under its own file; the start time
+        # keeps a restarted worker that reuses a pid from overwriting its predecessor
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._values = {}  # (name, label values) -> count, or [bucket counts..., sum, count]
+            self._dirty = False
+            self._filename = f'{self._pid}-{time.time_ns()}.json'
+            if self.directory:
+                threading.Thread(target=self._flush_periodically, daemon=True).start()
+                atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._check_process()
+            self._values[key] = self._values.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        key = (name, tuple(labels))
+        with self._lock:
+            self._check_process()
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+            self._dirty = True
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                self._check_process()
+                rows = [[name, list(labels), value] for (name, labels), value in self._values.items()]
+                self._dirty = False
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, self._filename)
+            temporary = f'{path}.tmp'
+            with open(temporary, 'w') as metrics_file:
+                json.dump(rows, metrics_file)
+            # Readers only ever see a complete file
+            os.replace(temporary, path)
+
+    def snapshot(self):
+        """Values of every process added up, keyed like the in-memory values."""
+        if not self.directory:
+            with self._lock:
+                self._check_process()
+                return {key: list(value) if isinstance(value, list) else value for key, value in self._values.items()}
+        self.flush()
+        totals = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as metrics_file:
+                    rows = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                key = (name, tuple(labels))
+                if isinstance(value, list):
+                    current = totals.setdefault(key, [0] * len(value))
+                    totals[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+def render_store(snapshot):
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for (series_name, labels), value in sorted(snapshot.items()):
+            if series_name != name:
+                continue
+            if kind != 'histogram':
+                lines.append(f'{name}{format_labels(label_names, labels)} {value}')
+                continue
+            # Stored per bucket; the exposition format wants running totals ending in +Inf
+            cumulative = 0
+            for bound, count in zip(buckets, value[:-2]):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(label_names, labels, [("le", repr(bound))])} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(label_names, labels, [("le", "+Inf")])} {value[-1]}')
+            lines.append(f'{name}_sum{format_labels(label_names, labels)} {float(value[-2])!r}')
+            lines.append(f'{name}_count{format_labels(label_names, labels)} {value[-1]}')
+    return lines
+
+def render_gauges():
+    """Gauges read from the database at scrape time, so every worker reports the same values."""
+    now = timezone.now()
+    lines = [
+        '# HELP elderly_emergency_notifications Emergency notifications, by status.',
+        '# TYPE elderly_emergency_notifications gauge',
+    ]
+    for status, count in sorted(stat_totals()['emergency'].items()):
+        lines.append(f'elderly_emergency_notifications{format_labels(("status",), (status,))} {count}')
+    lines += [
+        '# HELP elderly_service_requests_pending Pending service requests, by specialization.',
+        '# TYPE elderly_service_requests_pending gauge',
+    ]
+    pending = (
+        ServiceRequest.objects.filter(status='pending').values_list('specialization')
+        .annotate(count=Count('id')).order_by('specialization')
+    )
+    for specialization, count in pending:
+        lines.append(f'elderly_service_requests_pending{format_labels(("specialization",), (specialization,))} {count}')
+    queued = Job.objects.filter(status='queued').aggregate(
+        count=Count('id'), oldest_due=Min('run_after', filter=Q(run_after__lte=now)),
+    )
+    lag = (now - queued['oldest_due']).total_seconds() if queued['oldest_due'] else 0.0
+    lines += [
+        '# HELP elderly_jobs_queued Background jobs waiting in the queue.',
+        '# TYPE elderly_jobs_queued gauge',
+        f'elderly_jobs_queued {queued["count"]}',
+        '# HELP elderly_job_lag_seconds How long the oldest due job has been waiting for a worker.',
+        '# TYPE elderly_job_lag_seconds gauge',
+        f'elderly_job_lag_seconds {max(lag, 0.0):.3f}',
+    ]
+    return lines
+
+def render_metrics(store):
+    """The Prometheus text exposition of the request metrics and the database gauges."""
+    return '\n'.join(render_store(store.snapshot()) + render_gauges()) + '\n'
+
+metrics_store = MetricsStore(settings.METRICS_DIR or None)
@@ -0,0 +1,197 @@
+import contextlib
+import hmac
+import logging
+import time
+from collections import Counter
+from itertools import count
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.shortcuts import redirect, render
+
+from .auth import role_profile
+from .metrics import metrics_store
+from .profiling import ProfileCapture
+
+# Views reachable before the profile is complete or the doctor is verified
+PROFILE_EXEMPT_VIEWS = {
+    'home', 'user_login', 'user_register', 'profile', 'logout', 'logout_confirm_action',
+    'unverified_doctor', 'emergency_button', 'ingest_vitals', 'emergency_stream', 'available_slots', 'metrics',
+}
+
+logger = logging.getLogger(__name__)
+
+class RoleProfileMiddleware:
+    """
+    Attach the signed-in user's role profile as request.profile.
+
+    Elderly users, caregivers and doctors without a completed profile are sent to the
+    profile page, and unverified doctors see the verification notice, before any other
+    app view runs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        user = request.user
+        request.profile = role_profile(user) if user.is_authenticated else None
+        match = request.resolver_match
+        if not user.is_authenticated or match.namespace != 'elderly' or match.url_name in PROFILE_EXEMPT_VIEWS:
+            return None
+        if user.role in ('elderly', 'caregiver', 'doctor'):
+            if request.profile is None or not request.profile.first_name:
+                return redirect('elderly:profile')
+            if user.role == 'doctor' and not request.profile.verified_status:
+                return render(request, 'elderly/unverified_doctor.html')
+        return None
+
+class QueryStats:
+    """Database execute wrapper that counts, times and fingerprints every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        # The same parametrised SQL run more than once in a request is usually a query in a loop
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+class QueryBudgetMiddleware:
+    """
+    Report the queries each request ran as X-DB-* response headers and a log line.
+
+    Enabled by the QUERY_INSTRUMENTATION setting. Requests over QUERY_BUDGET queries are
+    logged as warnings together with their most repeated SQL.
+
+    Only queries run before the view returns are counted. A StreamingHttpResponse, such
+    as the data exports or the emergency stream, runs its queries while the body is sent,
+    after the headers have gone out, so those queries are not included.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        response['X-DB-Query-Count'] = str(stats.count)
+        response['X-DB-Query-Time'] = f'{stats.duration * 1000:.1f}'
+        response['X-DB-Duplicate-Queries'] = str(stats.duplicates)
+        if stats.count > settings.QUERY_BUDGET:
+            sql, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                '%s %s ran %d queries (%d duplicate) in %.1f ms; most repeated (%dx): %s',
+                request.method, request.path, stats.count, stats.duplicates, stats.duration * 1000, repeats, sql,
+            )
+        else:
+            logger.debug(
+                '%s %s ran %d queries (%d duplicate) in %.1f ms',
+                request.method, request.path, stats.count, stats.duplicates, stats.duration * 1000,
+            )
+        return response
+
+class ProfilingMiddleware:
+    """
+    Run cProfile and tracemalloc around the view of selected requests.
+
+    A request is profiled when PROFILING_ENABLED is set, when it sends the PROFILING_TOKEN
+    in an X-Profile header, or when it is one in every PROFILING_SAMPLE_RATE requests.
+    Captures are written to PROFILING_DIR, tagged with the URL name and role, for the
+    profile_report command to aggregate.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.PROFILING_ENABLED or settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.requests = count()
+
+    def __call__(self, request):
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            capture = getattr(request, '_profile_capture', None)
+            if capture is not None:
+                del request._profile_capture
+                try:
+                    name = capture.finish(settings.PROFILING_DIR, request, response.status_code if response else 500)
+                except Exception:
+                    # A capture that cannot be written must not fail the request it measured
+                    logger.exception('Could not save the profile of %s %s', request.method, request.path)
+                else:
+                    logger.info('Profiled %s %s as %s', request.method, request.path, name)
+        return response
+
+    def should_profile(self, request):
+        if settings.PROFILING_ENABLED:
+            return True
+        token = request.headers.get('X-Profile')
+        if token and settings.PROFILING_TOKEN and hmac.compare_digest(token, settings.PROFILING_TOKEN):
+            return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return bool(rate) and next(self.requests) % rate == 0
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.should_profile(request):
+            return None
+        user = request.user
+        role = user.role if user.is_authenticated else 'anonymous'
+        capture = ProfileCapture(request.resolver_match.view_name, role)
+        try:
+            capture.start()
+        except ValueError:
+            # Another profiler is already running in this thread
+            logger.warning('Skipped profiling %s: a profiler is already active', request.path)
+            return None
+        request._profile_capture = capture
+        return None
+
+class MetricsMiddleware:
+    """Record the latency, status and database time of every request for the /metrics endpoint."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        # RoleProfileMiddleware has loaded the user once request.profile is set; reading
+        # request.user anywhere else could cost a query just to label the metrics
+        user = request.user if hasattr(request, 'profile') else None
+        role = user.role if user is not None and user.is_authenticated else 'anonymous'
+        metrics_store.inc('elderly_http_requests_total', (view, role, response.status_code))
+        metrics_store.observe('elderly_http_request_duration_seconds', (view, role), duration)
+        metrics_store.observe('elderly_db_query_duration_seconds', (view,), stats.duration)
+        metrics_store.inc('elderly_db_queries_total', (view,), stats.count)
+        return response
@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-18 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_assignments(apps, schema_editor):
+    Caregiver = apps.get_model('Elderly', 'Caregiver')
+    ElderlyUser = apps.get_model('Elderly', 'ElderlyUser')
+    CaregiverAssignment = apps.get_model('Elderly', 'CaregiverAssignment')
+
+    existing_ids = set(ElderlyUser.objects.values_list('id', flat=True))
+    assignments = []
+    for caregiver_id, assigned_users in Caregiver.objects.values_list('id', 'assigned_users').iterator():
+        seen = set()
+        # Older rows hold a mix of ints and the string IDs posted by the assign form
+        for raw_id in assigned_users or []:
+            try:
+                elderly_user_id = int(raw_id)
+            except (TypeError, ValueError):
+                continue
+            if elderly_user_id in existing_ids and elderly_user_id not in seen:
+                seen.add(elderly_user_id)
+                assignments.append(CaregiverAssignment(caregiver_id=caregiver_id, elderly_user_id=elderly_user_id))
+    CaregiverAssignment.objects.bulk_create(assignments, batch_size=1000)
+
+
+def restore_assigned_users(apps, schema_editor):
+    Caregiver = apps.get_model('Elderly', 'Caregiver')
+    CaregiverAssignment = apps.get_model('Elderly', 'CaregiverAssignment')
+
+    assigned = {}
+    for caregiver_id, elderly_user_id in CaregiverAssignment.objects.order_by('id').values_list('caregiver_id', 'elderly_user_id'):
+        assigned.setdefault(caregiver_id, []).append(elderly_user_id)
+    caregivers = list(Caregiver.objects.all())
+    for caregiver in caregivers:
+        caregiver.assigned_users = assigned.get(caregiver.id, [])
+    Caregiver.objects.bulk_update(caregivers, ['assigned_users'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0010_alter_customuser_groups_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaregiverAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_at', models.DateTimeField(auto_now_add=True)),
+                ('caregiver', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='Elderly.caregiver')),
+                ('elderly_user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='Elderly.elderlyuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['elderly_user', 'caregiver'], name='assignment_elderly_idx')],
+                'constraints': [models.UniqueConstraint(fields=('caregiver', 'elderly_user'), name='unique_caregiver_assignment')],
+            },
+        ),
+        migrations.RunPython(backfill_assignments, restore_assigned_users),
+        migrations.RemoveField(
+            model_name='caregiver',
+            name='assigned_users',
+        ),
+        migrations.AddField(
+            model_name='caregiver',
+            name='assigned_users',
+            field=models.ManyToManyField(blank=True, related_name='caregivers', through='Elderly.CaregiverAssignment', to='Elderly.elderlyuser'),
+        ),
+    ]
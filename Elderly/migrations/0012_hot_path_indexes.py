@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0011_caregiverassignment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencynotification',
+            index=models.Index(fields=['elderly_user', 'status', '-timestamp'], name='emergency_user_status_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencynotification',
+            index=models.Index(condition=models.Q(('status', 'sent')), fields=['elderly_user', '-timestamp'], name='emergency_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbacknotification',
+            index=models.Index(fields=['notification', '-timestamp'], name='feedback_notification_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbacknotification',
+            index=models.Index(condition=models.Q(('status', 'sent')), fields=['notification', '-timestamp'], name='feedback_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status', 'specialization', 'timestamp'], name='request_status_spec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['elderly_user', '-timestamp'], name='request_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['specialization', 'timestamp'], name='request_pending_idx'),
+        ),
+    ]
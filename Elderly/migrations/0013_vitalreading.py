@@ -0,0 +1,88 @@
+# Generated by Django 5.2 on 2026-10-18 18:11
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BLOOD_PRESSURE_RE = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*$')
+
+
+def backfill_readings(apps, schema_editor):
+    HealthRecord = apps.get_model('Elderly', 'HealthRecord')
+    VitalReading = apps.get_model('Elderly', 'VitalReading')
+
+    readings = []
+    records = []
+    for record in HealthRecord.objects.iterator():
+        measured_at = record.last_updated
+        match = BLOOD_PRESSURE_RE.match(record.blood_pressure or '')
+        if match:
+            record.blood_pressure_systolic = int(match.group(1))
+            record.blood_pressure_diastolic = int(match.group(2))
+            readings.append(VitalReading(
+                elderly_user_id=record.elderly_user_id,
+                metric='blood_pressure',
+                value=record.blood_pressure_systolic,
+                systolic=record.blood_pressure_systolic,
+                diastolic=record.blood_pressure_diastolic,
+                measured_at=measured_at,
+            ))
+        if record.heart_rate is not None:
+            readings.append(VitalReading(
+                elderly_user_id=record.elderly_user_id, metric='heart_rate', value=record.heart_rate,
+                measured_at=measured_at,
+            ))
+        if record.sugar_levels is not None:
+            readings.append(VitalReading(
+                elderly_user_id=record.elderly_user_id, metric='sugar_levels', value=float(record.sugar_levels),
+                measured_at=measured_at,
+            ))
+        if match or record.heart_rate is not None or record.sugar_levels is not None:
+            record.vitals_measured_at = measured_at
+            records.append(record)
+    VitalReading.objects.bulk_create(readings, batch_size=1000)
+    HealthRecord.objects.bulk_update(
+        records, ['blood_pressure_systolic', 'blood_pressure_diastolic', 'vitals_measured_at'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0012_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthrecord',
+            name='blood_pressure_diastolic',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthrecord',
+            name='blood_pressure_systolic',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthrecord',
+            name='vitals_measured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='VitalReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('blood_pressure', 'Blood Pressure'), ('heart_rate', 'Heart Rate'), ('sugar_levels', 'Sugar Levels')], max_length=20)),
+                ('value', models.FloatField()),
+                ('systolic', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('diastolic', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('measured_at', models.DateTimeField()),
+                ('elderly_user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='Elderly.elderlyuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['elderly_user', 'metric', 'measured_at'], name='vital_user_metric_ts_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_readings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0014_vitalrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caregiver',
+            name='on_duty',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0016_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedicationReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('taken', 'Taken')], default='sent', max_length=10)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='dose_interval_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='next_dose_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(condition=models.Q(('next_dose_at__isnull', False)), fields=['next_dose_at'], name='prescription_next_dose_idx'),
+        ),
+        migrations.AddField(
+            model_name='medicationreminder',
+            name='elderly_user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='Elderly.elderlyuser'),
+        ),
+        migrations.AddField(
+            model_name='medicationreminder',
+            name='prescription',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Elderly.prescription'),
+        ),
+        migrations.AddIndex(
+            model_name='medicationreminder',
+            index=models.Index(fields=['elderly_user', 'status', '-due_at'], name='reminder_user_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='medicationreminder',
+            constraint=models.UniqueConstraint(fields=('prescription', 'due_at'), name='unique_medication_reminder'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0017_medication_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='Elderly.doctor')),
+                ('service_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='appointment', to='Elderly.servicerequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'starts_at'], name='appointment_doctor_ts_idx'), models.Index(fields=['ends_at'], name='appointment_ends_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'starts_at'), name='unique_doctor_appointment'), models.CheckConstraint(condition=models.Q(('ends_at__gt', models.F('starts_at'))), name='appointment_positive')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DoctorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('doctor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='Elderly.doctor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'starts_at'], name='availability_doctor_ts_idx'), models.Index(fields=['ends_at'], name='availability_ends_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('ends_at__gt', models.F('starts_at'))), name='availability_positive')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:28
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_stats(apps, schema_editor):
+    PlatformStat = apps.get_model('Elderly', 'PlatformStat')
+    stats = []
+    for kind, model_name in (('service_request', 'ServiceRequest'), ('emergency', 'EmergencyNotification')):
+        model = apps.get_model('Elderly', model_name)
+        totals = {}
+        rows = (
+            model.objects.annotate(day=TruncDate('timestamp'))
+            .values('status', 'day').annotate(count=Count('id')).order_by()
+        )
+        for row in rows:
+            stats.append(PlatformStat(kind=kind, status=row['status'], day=row['day'], count=row['count']))
+            totals[row['status']] = totals.get(row['status'], 0) + row['count']
+        stats += [PlatformStat(kind=kind, status=status, count=count) for status, count in totals.items()]
+    PlatformStat.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0019_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('service_request', 'Service Request'), ('emergency', 'Emergency Notification')], max_length=20)),
+                ('status', models.CharField(max_length=12)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'status', 'day'), name='unique_platform_stat_day'), models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('kind', 'status'), name='unique_platform_stat_total')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
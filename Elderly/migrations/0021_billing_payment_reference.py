@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0020_platform_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billing',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='billing',
+            name='payment_reference',
+            field=models.CharField(blank=True, max_length=30, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(condition=models.Q(('payment_status', 'pending')), fields=['paybill', 'account_number'], name='billing_pending_idx'),
+        ),
+    ]
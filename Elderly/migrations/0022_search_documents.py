@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# External-content FTS5 table over the documents; the triggers keep it in step with every write
+SQLITE_INDEX = (
+    """CREATE VIRTUAL TABLE "Elderly_searchdocument_fts" USING fts5(
+        title, body, doctors, content='Elderly_searchdocument', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER "Elderly_searchdocument_ai" AFTER INSERT ON "Elderly_searchdocument" BEGIN
+        INSERT INTO "Elderly_searchdocument_fts"(rowid, title, body, doctors)
+        VALUES (new.id, new.title, new.body, new.doctors);
+    END""",
+    """CREATE TRIGGER "Elderly_searchdocument_ad" AFTER DELETE ON "Elderly_searchdocument" BEGIN
+        INSERT INTO "Elderly_searchdocument_fts"("Elderly_searchdocument_fts", rowid, title, body, doctors)
+        VALUES ('delete', old.id, old.title, old.body, old.doctors);
+    END""",
+    """CREATE TRIGGER "Elderly_searchdocument_au" AFTER UPDATE ON "Elderly_searchdocument" BEGIN
+        INSERT INTO "Elderly_searchdocument_fts"("Elderly_searchdocument_fts", rowid, title, body, doctors)
+        VALUES ('delete', old.id, old.title, old.body, old.doctors);
+        INSERT INTO "Elderly_searchdocument_fts"(rowid, title, body, doctors)
+        VALUES (new.id, new.title, new.body, new.doctors);
+    END""",
+)
+SQLITE_DROP = (
+    'DROP TRIGGER "Elderly_searchdocument_au"',
+    'DROP TRIGGER "Elderly_searchdocument_ad"',
+    'DROP TRIGGER "Elderly_searchdocument_ai"',
+    'DROP TABLE "Elderly_searchdocument_fts"',
+)
+# Expression indexes matching the tsvectors built by Elderly.search
+POSTGRES_INDEX = (
+    """CREATE INDEX "search_document_text_idx" ON "Elderly_searchdocument" USING gin (
+        (setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B'))
+    )""",
+    """CREATE INDEX "search_document_doctors_idx" ON "Elderly_searchdocument"
+        USING gin (to_tsvector('simple', doctors))""",
+)
+POSTGRES_DROP = (
+    'DROP INDEX "search_document_doctors_idx"',
+    'DROP INDEX "search_document_text_idx"',
+)
+
+
+def run_for_vendor(sqlite_statements, postgres_statements):
+    def run(apps, schema_editor):
+        statements = {'sqlite': sqlite_statements, 'postgresql': postgres_statements}
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return run
+
+
+def backfill_documents(apps, schema_editor):
+    SearchDocument = apps.get_model('Elderly', 'SearchDocument')
+    ServiceRequest = apps.get_model('Elderly', 'ServiceRequest')
+    requests = {}
+    user_doctors = {}
+    for request_id, elderly_user_id, doctor_id in ServiceRequest.objects.values_list('id', 'elderly_user_id', 'doctor_id'):
+        requests[request_id] = (elderly_user_id, doctor_id)
+        if doctor_id:
+            user_doctors.setdefault(elderly_user_id, set()).add(doctor_id)
+    documents = [
+        SearchDocument(kind='health_record', object_id=record_id, elderly_user_id=elderly_user_id,
+                       doctors=' '.join(f'd{doctor_id}' for doctor_id in sorted(user_doctors.get(elderly_user_id, ()))),
+                       body=medical_history or '')
+        for record_id, elderly_user_id, medical_history in
+        apps.get_model('Elderly', 'HealthRecord').objects.values_list('id', 'elderly_user_id', 'medical_history')
+    ]
+    notes = (
+        ('observation', apps.get_model('Elderly', 'Observation').objects.values_list('id', 'request_id', 'notes')),
+        ('prescription', apps.get_model('Elderly', 'Prescription').objects.values_list(
+            'id', 'request_id', 'medication_name', 'additional_notes')),
+    )
+    for kind, rows in notes:
+        for object_id, request_id, *text in rows:
+            title, body = text if kind == 'prescription' else ('', text[0])
+            elderly_user_id, doctor_id = requests[request_id]
+            documents.append(SearchDocument(kind=kind, object_id=object_id, elderly_user_id=elderly_user_id,
+                                            request_id=request_id, doctors=f'd{doctor_id}' if doctor_id else '',
+                                            title=title, body=body))
+    SearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0021_billing_payment_reference'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('health_record', 'Health Record'), ('observation', 'Observation'), ('prescription', 'Prescription')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('doctors', models.TextField(blank=True, default='')),
+                ('title', models.CharField(blank=True, default='', max_length=100)),
+                ('body', models.TextField(blank=True, default='')),
+                ('elderly_user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='Elderly.elderlyuser')),
+                ('request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='Elderly.servicerequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['elderly_user', 'kind'], name='search_document_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            run_for_vendor(SQLITE_INDEX, POSTGRES_INDEX), run_for_vendor(SQLITE_DROP, POSTGRES_DROP)
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
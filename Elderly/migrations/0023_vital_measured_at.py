@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_measured_at(apps, schema_editor):
+    HealthRecord = apps.get_model('Elderly', 'HealthRecord')
+    VitalReading = apps.get_model('Elderly', 'VitalReading')
+    latest = {}
+    rows = VitalReading.objects.values_list('elderly_user_id', 'metric').annotate(latest=Max('measured_at')).order_by()
+    for elderly_user_id, metric, measured_at in rows:
+        latest.setdefault(elderly_user_id, {})[f'{metric}_measured_at'] = measured_at
+    records = []
+    for record in HealthRecord.objects.filter(elderly_user_id__in=latest):
+        for field, measured_at in latest[record.elderly_user_id].items():
+            setattr(record, field, measured_at)
+        records.append(record)
+    HealthRecord.objects.bulk_update(
+        records, ['blood_pressure_measured_at', 'heart_rate_measured_at', 'sugar_levels_measured_at'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0022_search_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthrecord',
+            name='blood_pressure_measured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthrecord',
+            name='heart_rate_measured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthrecord',
+            name='sugar_levels_measured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_measured_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:10
+
+import re
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+# Copied from Elderly.reminders as it stood when this migration was written, so later
+# changes to the live parsers cannot change what this migration does
+FREQUENCY_WORDS = {
+    'once': 1, 'one': 1, 'twice': 2, 'two': 2, 'three': 3, 'thrice': 3, 'four': 4,
+}
+FREQUENCY_ABBREVIATIONS = {
+    'od': 1, 'qd': 1, 'daily': 1, 'nightly': 1, 'bd': 2, 'bid': 2, 'tds': 3, 'tid': 3, 'qid': 4, 'qds': 4,
+}
+EVERY_HOURS_RE = re.compile(r'(?:every|q)\s*(\d+)\s*(?:h\b|hr|hrs|hour|hours)')
+TIMES_PER_DAY_RE = re.compile(r'(\d+|once|one|twice|two|three|thrice|four)\s*(?:x|times?)?\s*(?:a|per|/)?\s*(?:day|daily)')
+DURATION_RE = re.compile(r'(\d+)\s*(day|days|d|week|weeks|wk|wks|w|month|months|mo)?\b')
+DURATION_UNITS = {'day': 1, 'days': 1, 'd': 1, 'week': 7, 'weeks': 7, 'wk': 7, 'wks': 7, 'w': 7,
+                  'month': 30, 'months': 30, 'mo': 30}
+
+
+def parse_dose_interval(dosage):
+    text = (dosage or '').lower()
+    match = EVERY_HOURS_RE.search(text)
+    if match and int(match.group(1)) > 0:
+        return timedelta(hours=int(match.group(1)))
+    if 'weekly' in text or 'once a week' in text:
+        return timedelta(weeks=1)
+    match = TIMES_PER_DAY_RE.search(text)
+    if match:
+        count = match.group(1)
+        count = FREQUENCY_WORDS[count] if count in FREQUENCY_WORDS else int(count)
+        if count > 0:
+            return timedelta(days=1) / count
+    for word in re.findall(r'[a-z]+', text):
+        if word in FREQUENCY_ABBREVIATIONS:
+            return timedelta(days=1) / FREQUENCY_ABBREVIATIONS[word]
+    return timedelta(days=1)
+
+
+def parse_duration(duration):
+    text = (duration or '').lower()
+    if any(word in text for word in ('ongoing', 'indefinite', 'continuous', 'lifelong')):
+        return None
+    match = DURATION_RE.search(text)
+    if not match or int(match.group(1)) == 0:
+        return None
+    return timedelta(days=int(match.group(1)) * DURATION_UNITS[match.group(2) or 'days'])
+
+
+def following_dose(due_at, interval_minutes, ends_at, now):
+    interval = timedelta(minutes=interval_minutes)
+    next_due = due_at + interval
+    if next_due <= now:
+        next_due += interval * ((now - next_due) // interval + 1)
+    if ends_at and next_due > ends_at:
+        return None
+    return next_due
+
+
+def backfill_schedules(apps, schema_editor):
+    Prescription = apps.get_model('Elderly', 'Prescription')
+    now = timezone.now()
+    unscheduled = Prescription.objects.filter(starts_at__isnull=True).select_related('request').order_by('id')
+    last_id = 0
+    # Walked in id batches rather than with one open cursor, since each batch rewrites the
+    # starts_at column the query filters on
+    while True:
+        prescriptions = list(unscheduled.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not prescriptions:
+            break
+        for prescription in prescriptions:
+            course = parse_duration(prescription.duration)
+            prescription.starts_at = prescription.request.timestamp
+            prescription.dose_interval_minutes = max(
+                int(parse_dose_interval(prescription.dosage).total_seconds() // 60), 1
+            )
+            prescription.ends_at = prescription.starts_at + course if course else None
+            if prescription.request.status in ('completed', 'rejected'):
+                prescription.next_dose_at = None
+            else:
+                # Doses already past are skipped rather than all reminded at once
+                prescription.next_dose_at = following_dose(
+                    prescription.starts_at, prescription.dose_interval_minutes, prescription.ends_at, now
+                )
+        Prescription.objects.bulk_update(
+            prescriptions, ['starts_at', 'dose_interval_minutes', 'ends_at', 'next_dose_at']
+        )
+        last_id = prescriptions[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0023_vital_measured_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_schedules, migrations.RunPython.noop),
+    ]
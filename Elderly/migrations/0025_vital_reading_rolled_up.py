@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+def mark_rolled_up(apps, schema_editor):
+    RollupWatermark = apps.get_model('Elderly', 'RollupWatermark')
+    VitalReading = apps.get_model('Elderly', 'VitalReading')
+    watermark = RollupWatermark.objects.filter(name='vital_readings').first()
+    if watermark is not None:
+        VitalReading.objects.filter(id__lte=watermark.last_reading_id).update(rolled_up=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0024_schedule_existing_prescriptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vitalreading',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_rolled_up, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vitalreading',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['id'], name='vital_pending_rollup_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:16
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0025_vital_reading_rolled_up'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='emergencynotification',
+            name='emergency_sent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='feedbacknotification',
+            name='feedback_sent_idx',
+        ),
+    ]
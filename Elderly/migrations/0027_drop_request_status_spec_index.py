@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Elderly', '0026_drop_sent_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='servicerequest',
+            name='request_status_spec_idx',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
@@ -27,6 +28,11 @@ class CustomUser(AbstractUser):
         verbose_name='user permissions',
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_joined_idx'),
+        ]
+
 class ElderlyUser(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=50, blank=True, null=True)
@@ -42,7 +48,28 @@ class Caregiver(models.Model):
     last_name = models.CharField(max_length=50, blank=True, null=True)
     relationship = models.CharField(max_length=50, blank=True, null=True)
     contact_number = models.CharField(max_length=15, blank=True, null=True)
-    assigned_users = models.JSONField(default=list, blank=True, null=True)  # Initialize to an empty list
+    on_duty = models.BooleanField(default=True)
+    assigned_users = models.ManyToManyField(
+        ElderlyUser,
+        through='CaregiverAssignment',
+        related_name='caregivers',
+        blank=True,
+    )
+
+class CaregiverAssignment(models.Model):
+    # The unique constraint indexes (caregiver, elderly_user) and the composite index
+    # covers the reverse direction, so the single-column FK indexes are redundant.
+    caregiver = models.ForeignKey(Caregiver, on_delete=models.CASCADE, db_index=False)
+    elderly_user = models.ForeignKey(ElderlyUser, on_delete=models.CASCADE, db_index=False)
+    assigned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['caregiver', 'elderly_user'], name='unique_caregiver_assignment'),
+        ]
+        indexes = [
+            models.Index(fields=['elderly_user', 'caregiver'], name='assignment_elderly_idx'),
+        ]
 
 class Doctor(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
@@ -67,9 +94,16 @@ class HealthRecord(models.Model):
     medical_history = models.TextField(blank=True, null=True)
     current_medications = models.TextField(blank=True, null=True)
     allergies = models.TextField(blank=True, null=True)
+    # Latest vitals, cached from VitalReading so dashboards read a single row
     blood_pressure = models.CharField(max_length=20, blank=True, null=True)  # Example format: "120/80"
+    blood_pressure_systolic = models.PositiveSmallIntegerField(blank=True, null=True)
+    blood_pressure_diastolic = models.PositiveSmallIntegerField(blank=True, null=True)
     heart_rate = models.IntegerField(blank=True, null=True)
     sugar_levels = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    vitals_measured_at = models.DateTimeField(blank=True, null=True)
+    blood_pressure_measured_at = models.DateTimeField(blank=True, null=True)
+    heart_rate_measured_at = models.DateTimeField(blank=True, null=True)
+    sugar_levels_measured_at = models.DateTimeField(blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
@@ -87,6 +121,62 @@ class HealthRecord(models.Model):
                 self.medical_history += "- Geriatrician: No specific issues noted.\n"
         super().save(*args, **kwargs)
 
+class VitalReading(models.Model):
+    METRIC_CHOICES = (
+        ('blood_pressure', 'Blood Pressure'),
+        ('heart_rate', 'Heart Rate'),
+        ('sugar_levels', 'Sugar Levels'),
+    )
+    # Append-only history; the composite index also serves elderly_user lookups
+    elderly_user = models.ForeignKey(ElderlyUser, on_delete=models.CASCADE, db_index=False)
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    value = models.FloatField()  # Systolic pressure for blood_pressure readings
+    systolic = models.PositiveSmallIntegerField(blank=True, null=True)
+    diastolic = models.PositiveSmallIntegerField(blank=True, null=True)
+    measured_at = models.DateTimeField()
+    rolled_up = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['elderly_user', 'metric', 'measured_at'], name='vital_user_metric_ts_idx'),
+            # Only readings still waiting for rollup_vitals are indexed
+            models.Index(fields=['id'], condition=models.Q(rolled_up=False), name='vital_pending_rollup_idx'),
+        ]
+
+class VitalRollup(models.Model):
+    GRANULARITY_CHOICES = (
+        ('hour', 'Hourly'),
+        ('day', 'Daily'),
+    )
+    # Pre-aggregated VitalReading buckets, filled incrementally by the rollup_vitals command
+    elderly_user = models.ForeignKey(ElderlyUser, on_delete=models.CASCADE, db_index=False)
+    metric = models.CharField(max_length=20, choices=VitalReading.METRIC_CHOICES)
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0)
+    minimum = models.FloatField()
+    maximum = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['elderly_user', 'metric', 'granularity', 'bucket_start'],
+                name='unique_vital_rollup',
+            ),
+        ]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+class RollupWatermark(models.Model):
+    # Locked for each rollup chunk so concurrent runs cannot fold the same readings twice.
+    # last_reading_id is informational only: VitalReading.rolled_up decides what is folded
+    name = models.CharField(max_length=50, unique=True)
+    last_reading_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
 class ServiceRequest(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -101,6 +191,50 @@ class ServiceRequest(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['elderly_user', '-timestamp'], name='request_user_ts_idx'),
+            # Every status and specialization lookup is for the doctors' pending queue, so the
+            # partial index covers it without indexing settled requests
+            models.Index(
+                fields=['specialization', 'timestamp'],
+                condition=models.Q(status='pending'),
+                name='request_pending_idx',
+            ),
+        ]
+
+class DoctorAvailability(models.Model):
+    # A window in which the doctor can be booked
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, db_index=False, related_name='availability')
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at'], name='availability_doctor_ts_idx'),
+            models.Index(fields=['ends_at'], name='availability_ends_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(ends_at__gt=models.F('starts_at')), name='availability_positive'),
+        ]
+
+class Appointment(models.Model):
+    service_request = models.OneToOneField(ServiceRequest, on_delete=models.CASCADE, related_name='appointment')
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, db_index=False, related_name='appointments')
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at'], name='appointment_doctor_ts_idx'),
+            models.Index(fields=['ends_at'], name='appointment_ends_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'starts_at'], name='unique_doctor_appointment'),
+            models.CheckConstraint(condition=models.Q(ends_at__gt=models.F('starts_at')), name='appointment_positive'),
+        ]
+
 class Observation(models.Model):
     request = models.ForeignKey(ServiceRequest, on_delete=models.CASCADE)
     notes = models.TextField()
@@ -112,6 +246,60 @@ class Prescription(models.Model):
     dosage = models.CharField(max_length=50)
     duration = models.CharField(max_length=50)
     additional_notes = models.TextField()
+    # Dose schedule parsed from dosage/duration; next_dose_at is cleared once the course ends
+    dose_interval_minutes = models.PositiveIntegerField(blank=True, null=True)
+    starts_at = models.DateTimeField(blank=True, null=True)
+    ends_at = models.DateTimeField(blank=True, null=True)
+    next_dose_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_dose_at'],
+                condition=models.Q(next_dose_at__isnull=False),
+                name='prescription_next_dose_idx',
+            ),
+        ]
+
+    SCHEDULE_FIELDS = ('dose_interval_minutes', 'ends_at', 'next_dose_at')
+
+    def save(self, *args, **kwargs):
+        from .reminders import reschedule_prescription, schedule_prescription
+        # Stashed by the remember_saved_schedule post_init receiver
+        saved_schedule = self._saved_schedule
+        update_fields = kwargs.get('update_fields')
+        if self.starts_at is None:
+            schedule_prescription(self)
+        elif (
+            saved_schedule is not None and Ellipsis not in saved_schedule
+            and saved_schedule != (self.dosage, self.duration)
+            and (update_fields is None or {'dosage', 'duration'} & set(update_fields))
+        ):
+            reschedule_prescription(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.SCHEDULE_FIELDS}
+        super().save(*args, **kwargs)
+        self._saved_schedule = (self.dosage, self.duration)
+
+class MedicationReminder(models.Model):
+    STATUS_CHOICES = (
+        ('sent', 'Sent'),
+        ('taken', 'Taken'),
+    )
+    prescription = models.ForeignKey(Prescription, on_delete=models.CASCADE)
+    elderly_user = models.ForeignKey(ElderlyUser, on_delete=models.CASCADE, db_index=False)
+    due_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='sent')
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Makes emitting a dose idempotent if the scheduler retries a batch
+            models.UniqueConstraint(fields=['prescription', 'due_at'], name='unique_medication_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['elderly_user', 'status', '-due_at'], name='reminder_user_status_idx'),
+        ]
 
 class Billing(models.Model):
     PAYMENT_STATUS_CHOICES = (
@@ -124,6 +312,18 @@ class Billing(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     paybill = models.CharField(max_length=20, blank=True, null=True)
     account_number = models.CharField(max_length=20, blank=True, null=True)
+    # Set when a paybill statement line is matched to the bill
+    payment_reference = models.CharField(max_length=30, blank=True, null=True, unique=True)
+    paid_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['paybill', 'account_number'],
+                condition=models.Q(payment_status='pending'),
+                name='billing_pending_idx',
+            ),
+        ]
 
 class EmergencyNotification(models.Model):
     STATUS_CHOICES = (
@@ -136,6 +336,11 @@ class EmergencyNotification(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=12, choices=STATUS_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['elderly_user', 'status', '-timestamp'], name='emergency_user_status_ts_idx'),
+        ]
+
 class FeedbackNotification(models.Model):
     STATUS_CHOICES = (
         ('sent', 'Sent'),
@@ -144,4 +349,79 @@ class FeedbackNotification(models.Model):
     notification = models.ForeignKey(EmergencyNotification, on_delete=models.CASCADE)
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
\ No newline at end of file
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['notification', '-timestamp'], name='feedback_notification_ts_idx'),
+        ]
+
+class PlatformStat(models.Model):
+    KIND_CHOICES = (
+        ('service_request', 'Service Request'),
+        ('emergency', 'Emergency Notification'),
+    )
+    # Rows per status by creation day; the day-less row holds the all-time total
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=12)
+    day = models.DateField(blank=True, null=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'status', 'day'], name='unique_platform_stat_day'),
+            models.UniqueConstraint(
+                fields=['kind', 'status'], condition=models.Q(day__isnull=True), name='unique_platform_stat_total'
+            ),
+        ]
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    # Background work claimed and run by the run_jobs worker command
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], condition=models.Q(status='queued'), name='job_queued_idx'),
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx'),
+        ]
+
+class SearchDocument(models.Model):
+    KIND_CHOICES = (
+        ('health_record', 'Health Record'),
+        ('observation', 'Observation'),
+        ('prescription', 'Prescription'),
+    )
+    # Searchable text of one health record, observation or prescription, indexed by the
+    # database's full-text engine and kept in sync by signals
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    elderly_user = models.ForeignKey(ElderlyUser, on_delete=models.CASCADE, db_index=False)
+    request = models.ForeignKey(ServiceRequest, on_delete=models.CASCADE, blank=True, null=True)
+    # "d<id>" tokens of the doctors who may see the document, matched by the full-text index
+    doctors = models.TextField(blank=True, default='')
+    title = models.CharField(max_length=100, blank=True, default='')
+    body = models.TextField(blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['elderly_user', 'kind'], name='search_document_user_idx'),
+        ]
@@ -0,0 +1,88 @@
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+class KeysetPage:
+    def __init__(self, items, next_query=None, previous_query=None):
+        self.items = items
+        self.next_query = next_query
+        self.previous_query = previous_query
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_query or self.previous_query)
+
+def encode_cursor(direction, values):
+    # Full isoformat: a key rounded to milliseconds would skip or repeat rows at page edges
+    values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value for value in values]
+    raw = json.dumps([direction, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, model, fields):
+    """Direction and typed key values of a cursor; None for a missing or tampered cursor."""
+    if not cursor:
+        return None
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if direction not in ('next', 'previous') or len(values) != len(fields):
+            return None
+        return direction, [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        return None
+
+def seek_filter(ordering, values, forward):
+    """Rows strictly after `values` in `ordering` (or strictly before when not `forward`)."""
+    conditions = []
+    for i, field in enumerate(ordering):
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        equal = {ordering[j].lstrip('-'): values[j] for j in range(i)}
+        conditions.append(Q(**equal, **{f'{name}__{lookup}': values[i]}))
+    return reduce(lambda a, b: a | b, conditions)
+
+def reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else '-' + field for field in ordering]
+
+def keyset_paginate(request, queryset, ordering, param='cursor', page_size=PAGE_SIZE):
+    """
+    Seek pagination over `queryset` in `ordering`, which must end in a unique field such as id.
+
+    Each page is a range read from the last key of the previous page, so it costs the same
+    however deep it is. Cursors are opaque query parameters named `param`.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    cursor = decode_cursor(request.GET.get(param), queryset.model, fields)
+    if cursor is None:
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_next, has_previous = len(rows) > page_size, False
+        rows = rows[:page_size]
+    elif cursor[0] == 'next':
+        rows = list(queryset.filter(seek_filter(ordering, cursor[1], True)).order_by(*ordering)[:page_size + 1])
+        has_next, has_previous = len(rows) > page_size, True
+        rows = rows[:page_size]
+    else:
+        rows = list(
+            queryset.filter(seek_filter(ordering, cursor[1], False))
+            .order_by(*reverse_ordering(ordering))[:page_size + 1]
+        )
+        has_next, has_previous = True, len(rows) > page_size
+        rows = rows[:page_size][::-1]
+
+    def page_query(direction, row):
+        query = request.GET.copy()
+        query[param] = encode_cursor(direction, [getattr(row, field) for field in fields])
+        return query.urlencode()
+
+    return KeysetPage(
+        rows,
+        next_query=page_query('next', rows[-1]) if has_next and rows else None,
+        previous_query=page_query('previous', rows[0]) if has_previous and rows else None,
+    )
@@ -0,0 +1,153 @@
+import csv
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Billing
+
+MATCH_UPDATE_BATCH_SIZE = 1000
+STATEMENT_CHUNK_SIZE = 5000
+CENTS = Decimal('0.01')
+RECEIPT_MAX_LENGTH = Billing._meta.get_field('payment_reference').max_length
+
+# Header spellings seen in paybill statement exports, normalised to lower case
+STATEMENT_COLUMNS = {
+    'receipt': ('receipt', 'receipt no.', 'receipt no', 'receipt number', 'transid', 'transaction id'),
+    'account': ('account_number', 'account', 'account no.', 'a/c no.', 'a/c no', 'bill ref number', 'billrefnumber'),
+    'amount': ('amount', 'paid in', 'transamount', 'trans amount'),
+    'status': ('transaction status', 'status'),
+}
+
+def normalize_account(value):
+    return ''.join((value or '').split()).upper()
+
+def parse_amount(value):
+    try:
+        amount = Decimal((value or '').replace(',', '').strip())
+    except InvalidOperation:
+        return None
+    return amount.quantize(CENTS) if amount.is_finite() and amount > 0 else None
+
+def statement_columns(fieldnames):
+    """Map each statement field we need to the position of its column."""
+    headers = {(name or '').strip().lower(): position for position, name in enumerate(fieldnames or ())}
+    columns = {}
+    for field, aliases in STATEMENT_COLUMNS.items():
+        columns[field] = next((headers[alias] for alias in aliases if alias in headers), None)
+    missing = [field for field in ('receipt', 'account', 'amount') if columns[field] is None]
+    if missing:
+        raise ValueError(f'Statement is missing column(s): {", ".join(missing)}')
+    return columns
+
+def pending_bill_index(paybill=None):
+    """Pending bills keyed by (account_number, amount), oldest first within a key."""
+    bills = Billing.objects.filter(payment_status='pending')
+    if paybill:
+        bills = bills.filter(paybill=paybill)
+    index = {}
+    rows = bills.order_by('timestamp', 'id').values_list('id', 'account_number', 'service_cost')
+    for bill_id, account_number, service_cost in rows.iterator(chunk_size=10000):
+        index.setdefault((normalize_account(account_number), service_cost.quantize(CENTS)), deque()).append(bill_id)
+    return index
+
+def match_statement(lines, index, chunk_size=STATEMENT_CHUNK_SIZE):
+    """
+    Match statement rows to bills in a single streaming pass.
+
+    Returns (matches, unmatched): matches are (bill_id, line_number, receipt, account, amount)
+    and unmatched are (line_number, receipt, account, amount, reason) tuples for the report. Rows are read in
+    chunks so receipts reconciled by an earlier run can be looked up in bulk.
+    """
+    reader = csv.reader(lines)
+    columns = statement_columns(next(reader, None))
+    receipt_column, account_column, amount_column = columns['receipt'], columns['account'], columns['amount']
+    status_column = columns['status']
+    width = max(position for position in columns.values() if position is not None) + 1
+    matches = []
+    unmatched = []
+    seen_receipts = set()
+    # Header is line 1
+    rows = enumerate(reader, start=2)
+    while True:
+        chunk = []
+        for line_number, row in islice(rows, chunk_size):
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            receipt = row[receipt_column].strip()
+            account = normalize_account(row[account_column])
+            raw_amount = row[amount_column]
+            if status_column is not None and row[status_column].strip().lower() not in ('', 'completed'):
+                unmatched.append((line_number, receipt, account, raw_amount, 'transaction not completed'))
+                continue
+            amount = parse_amount(raw_amount)
+            if not receipt or not account or amount is None:
+                unmatched.append((line_number, receipt, account, raw_amount, 'missing receipt, account or amount'))
+                continue
+            if len(receipt) > RECEIPT_MAX_LENGTH:
+                unmatched.append((line_number, receipt, account, raw_amount, 'receipt too long'))
+                continue
+            chunk.append((line_number, receipt, account, raw_amount, amount))
+        if not chunk:
+            break
+        # Only lines that could take a bill need checking against earlier runs
+        recorded = already_recorded(
+            receipt for _, receipt, account, _, amount in chunk if index.get((account, amount))
+        )
+        for line_number, receipt, account, raw_amount, amount in chunk:
+            if receipt in recorded:
+                unmatched.append((line_number, receipt, account, raw_amount, 'already reconciled'))
+                continue
+            if receipt in seen_receipts:
+                unmatched.append((line_number, receipt, account, raw_amount, 'duplicate receipt'))
+                continue
+            seen_receipts.add(receipt)
+            bills = index.get((account, amount))
+            if not bills:
+                unmatched.append((line_number, receipt, account, raw_amount, 'no pending bill'))
+                continue
+            matches.append((bills.popleft(), line_number, receipt, account, raw_amount))
+    unmatched.sort(key=lambda line: line[0])
+    return matches, unmatched
+
+def mark_bills_paid(matches, batch_size=MATCH_UPDATE_BATCH_SIZE):
+    """
+    Mark matched bills paid and record their receipts.
+
+    Returns (updated, skipped): the number of bills updated and the matches left alone
+    because their bill was paid through the site after the index was built.
+    """
+    paid_at = timezone.now()
+    updated = 0
+    skipped = []
+    with transaction.atomic():
+        for start in range(0, len(matches), batch_size):
+            batch = matches[start:start + batch_size]
+            # Locked so a payment through the site cannot land between the check and the update
+            pending = set(
+                Billing.objects.select_for_update()
+                .filter(id__in=[match[0] for match in batch], payment_status='pending')
+                .values_list('id', flat=True)
+            )
+            bills = []
+            for match in batch:
+                bill_id, _, receipt, _, _ = match
+                if bill_id in pending:
+                    bills.append(Billing(id=bill_id, payment_status='paid', payment_reference=receipt, paid_at=paid_at))
+                else:
+                    skipped.append(match)
+            updated += Billing.objects.bulk_update(bills, ['payment_status', 'payment_reference', 'paid_at'])
+    return updated, skipped
+
+def already_recorded(receipts):
+    """Receipts from `receipts` that earlier runs already matched."""
+    receipts = list(receipts)
+    recorded = set()
+    for start in range(0, len(receipts), MATCH_UPDATE_BATCH_SIZE):
+        recorded.update(
+            Billing.objects.filter(payment_reference__in=receipts[start:start + MATCH_UPDATE_BATCH_SIZE])
+            .values_list('payment_reference', flat=True)
+        )
+    return recorded
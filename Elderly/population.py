@@ -0,0 +1,247 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import SLOT_LENGTH, slot_index
+from .dispatch import dispatcher
+from .models import (
+    Admin, Appointment, Billing, Caregiver, CaregiverAssignment, CustomUser, Doctor, DoctorAvailability, ElderlyUser,
+    EmergencyNotification, FeedbackNotification, HealthRecord, Observation, Prescription, ServiceRequest,
+    VitalReading
+)
+from .reminders import schedule_prescription
+from .search import rebuild_search_index
+from .stats import rebuild_stats
+from .vitals import apply_latest_readings
+
+SEED_BATCH_SIZE = 1000
+SEED_PASSWORD = 'seed-password'
+SEED_PAYBILL = '600100'
+
+FIRST_NAMES = (
+    'Achieng', 'Wanjiru', 'Otieno', 'Kamau', 'Njeri', 'Mutua', 'Akinyi', 'Kiprono', 'Wambui', 'Omondi',
+    'Chebet', 'Mwangi', 'Nafula', 'Kariuki', 'Atieno', 'Kipchoge', 'Muthoni', 'Ouma', 'Jepkosgei', 'Njoroge',
+)
+LAST_NAMES = (
+    'Odhiambo', 'Kimani', 'Wafula', 'Mugo', 'Korir', 'Nyambura', 'Ochieng', 'Kilonzo', 'Rotich', 'Gitau',
+)
+MEDICATIONS = (
+    ('Amlodipine', '5mg once daily', '30 days'),
+    ('Metformin', '500mg twice daily', '90 days'),
+    ('Atorvastatin', '20mg once daily', '30 days'),
+    ('Donepezil', '5mg once daily', '60 days'),
+    ('Paracetamol', '1g every 8 hours', '5 days'),
+)
+# Relative frequency of each status among generated rows
+REQUEST_STATUS_WEIGHTS = {'pending': 20, 'accepted': 15, 'scheduled': 10, 'completed': 45, 'rejected': 10}
+EMERGENCY_STATUS_WEIGHTS = {'sent': 15, 'acknowledged': 25, 'resolved': 60}
+
+def weighted_choice(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def create_users(prefix, role, count, password_hash, rng, now, days, batch_size):
+    users = [
+        CustomUser(
+            username=f'{prefix}-{role}-{i}@example.com',
+            email=f'{prefix}-{role}-{i}@example.com',
+            role=role,
+            password=password_hash,
+            date_joined=now - timedelta(seconds=rng.randrange(days * 86400)),
+        )
+        for i in range(count)
+    ]
+    return CustomUser.objects.bulk_create(users, batch_size=batch_size)
+
+def backdate(objects, field, times, batch_size):
+    """Write generated times over the creation time bulk_create gives auto_now_add fields."""
+    for obj, value in zip(objects, times):
+        setattr(obj, field, value)
+    if objects:
+        type(objects[0]).objects.bulk_update(objects, [field], batch_size=batch_size)
+
+def seed_population(elderly=1000, caregivers=100, doctors=50, requests_per_user=5, emergencies_per_user=2,
+                    readings_per_user=20, days=90, seed=0, prefix='seed', batch_size=SEED_BATCH_SIZE):
+    """
+    Bulk-create a synthetic population; the same seed always generates the same rows.
+
+    Timestamps are spread over the `days` before now. Every request and emergency status
+    occurs, and platform statistics and search documents are rebuilt at the end because
+    bulk inserts send no signals. For the same reason only this process drops its emergency
+    routes and slot calendars on commit; other running workers pick the new rows up on their
+    next periodic rebuild, so restart them to serve the population straight away. Returns
+    the number of rows created per model name.
+    """
+    rng = random.Random(seed)
+    now = timezone.now().replace(microsecond=0)
+    password_hash = make_password(SEED_PASSWORD)
+    created = {}
+
+    def random_time():
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    def name():
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    with transaction.atomic():
+        users = {
+            role: create_users(prefix, role, count, password_hash, rng, now, days, batch_size)
+            for role, count in (('elderly', elderly), ('caregiver', caregivers), ('doctor', doctors), ('admin', 1))
+        }
+        Admin.objects.create(user=users['admin'][0], permissions={'manage_users': True})
+
+        elderly_users = []
+        for user in users['elderly']:
+            first_name, last_name = name()
+            elderly_users.append(ElderlyUser(
+                user=user, first_name=first_name, last_name=last_name, gender=rng.choice(('female', 'male')),
+                date_of_birth=(now - timedelta(days=365 * rng.randint(65, 95))).date(),
+            ))
+        elderly_users = ElderlyUser.objects.bulk_create(elderly_users, batch_size=batch_size)
+        caregiver_profiles = []
+        for user in users['caregiver']:
+            first_name, last_name = name()
+            caregiver_profiles.append(Caregiver(
+                user=user, first_name=first_name, last_name=last_name, relationship='Nurse', on_duty=rng.random() < 0.8,
+            ))
+        caregiver_profiles = Caregiver.objects.bulk_create(caregiver_profiles, batch_size=batch_size)
+        specializations = [value for value, _ in Doctor.SPECIALIZATION_CHOICES]
+        doctor_profiles = []
+        for i, user in enumerate(users['doctor']):
+            first_name, last_name = name()
+            doctor_profiles.append(Doctor(
+                user=user, first_name=first_name, last_name=last_name, license_number=f'{prefix.upper()}-{i:06d}',
+                # Cycling through the specializations leaves none of them without a doctor
+                specialization=specializations[i % len(specializations)], verified_status=rng.random() < 0.9,
+            ))
+        doctor_profiles = Doctor.objects.bulk_create(doctor_profiles, batch_size=batch_size)
+        doctors_by_specialization = {}
+        for doctor in doctor_profiles:
+            doctors_by_specialization.setdefault(doctor.specialization, []).append(doctor)
+        created.update(CustomUser=sum(map(len, users.values())), ElderlyUser=len(elderly_users),
+                       Caregiver=len(caregiver_profiles), Doctor=len(doctor_profiles))
+
+        # Working hours for the next two weeks
+        tomorrow = timezone.localtime(now).replace(hour=8, minute=0, second=0) + timedelta(days=1)
+        availability = [
+            DoctorAvailability(doctor=doctor, starts_at=tomorrow + timedelta(days=day),
+                               ends_at=tomorrow + timedelta(days=day, hours=8))
+            for doctor in doctor_profiles for day in range(14)
+        ]
+        created['DoctorAvailability'] = len(DoctorAvailability.objects.bulk_create(availability, batch_size=batch_size))
+
+        assignments, assigned_at = [], []
+        caregivers_of = {}
+        for elderly_user in elderly_users:
+            chosen = rng.sample(caregiver_profiles, min(rng.randint(1, 2), len(caregiver_profiles)))
+            caregivers_of[elderly_user.id] = chosen
+            for caregiver in chosen:
+                assignments.append(CaregiverAssignment(caregiver=caregiver, elderly_user=elderly_user))
+                assigned_at.append(random_time())
+        assignments = CaregiverAssignment.objects.bulk_create(assignments, batch_size=batch_size)
+        backdate(assignments, 'assigned_at', assigned_at, batch_size)
+        created['CaregiverAssignment'] = len(assignments)
+
+        health_records, readings = [], []
+        for elderly_user in elderly_users:
+            health_record = HealthRecord(
+                elderly_user=elderly_user, medical_history='Default Medical History:\n',
+                current_medications='None', allergies='None',
+            )
+            user_readings = []
+            for _ in range(readings_per_user):
+                metric = rng.choice(('blood_pressure', 'heart_rate', 'sugar_levels'))
+                measured_at = random_time()
+                if metric == 'blood_pressure':
+                    systolic, diastolic = rng.randint(100, 170), rng.randint(60, 100)
+                    user_readings.append(VitalReading(elderly_user=elderly_user, metric=metric, value=systolic,
+                                                      systolic=systolic, diastolic=diastolic, measured_at=measured_at))
+                else:
+                    # Sugar in mg/dL, the unit VITAL_RANGES and the health record form use
+                    value = rng.randint(50, 120) if metric == 'heart_rate' else round(rng.uniform(60, 200), 1)
+                    user_readings.append(VitalReading(elderly_user=elderly_user, metric=metric, value=value,
+                                                      measured_at=measured_at))
+            # The record carries the latest readings, as ingest_vitals would have left it
+            apply_latest_readings(health_record, user_readings)
+            health_records.append(health_record)
+            readings.extend(user_readings)
+        created['HealthRecord'] = len(HealthRecord.objects.bulk_create(health_records, batch_size=batch_size))
+        created['VitalReading'] = len(VitalReading.objects.bulk_create(readings, batch_size=batch_size))
+
+        service_requests, request_times = [], []
+        for elderly_user in elderly_users:
+            for _ in range(requests_per_user):
+                specialization = rng.choice(specializations)
+                status = weighted_choice(rng, REQUEST_STATUS_WEIGHTS)
+                doctor = None
+                if status not in ('pending', 'rejected'):
+                    doctor = rng.choice(doctors_by_specialization[specialization])
+                service_requests.append(ServiceRequest(
+                    elderly_user=elderly_user, doctor=doctor, specialization=specialization, status=status,
+                ))
+                request_times.append(random_time())
+        service_requests = ServiceRequest.objects.bulk_create(service_requests, batch_size=batch_size)
+        backdate(service_requests, 'timestamp', request_times, batch_size)
+        created['ServiceRequest'] = len(service_requests)
+
+        appointments, observations, prescriptions, bills = [], [], [], []
+        next_slot = {}
+        for service_request in service_requests:
+            if service_request.status == 'scheduled':
+                starts_at = next_slot.get(service_request.doctor_id, tomorrow)
+                next_slot[service_request.doctor_id] = starts_at + SLOT_LENGTH
+                appointments.append(Appointment(service_request=service_request, doctor=service_request.doctor,
+                                                starts_at=starts_at, ends_at=starts_at + SLOT_LENGTH))
+            elif service_request.status == 'completed':
+                observations.append(Observation(request=service_request, notes='Vitals stable; follow up in a month.'))
+                medication_name, dosage, duration = rng.choice(MEDICATIONS)
+                prescription = Prescription(request=service_request, medication_name=medication_name,
+                                            dosage=dosage, duration=duration, additional_notes='')
+                schedule_prescription(prescription, starts_at=service_request.timestamp)
+                prescriptions.append(prescription)
+                paid = rng.random() < 0.7
+                bills.append(Billing(
+                    request=service_request, service_cost=Decimal(rng.randrange(500, 5000, 50)),
+                    payment_status='paid' if paid else 'pending', paybill=SEED_PAYBILL,
+                    account_number=f'{prefix.upper()}{service_request.id}',
+                    payment_reference=f'{prefix.upper()}R{service_request.id}' if paid else None,
+                    paid_at=service_request.timestamp + timedelta(days=1) if paid else None,
+                ))
+        created['Appointment'] = len(Appointment.objects.bulk_create(appointments, batch_size=batch_size))
+        observations = Observation.objects.bulk_create(observations, batch_size=batch_size)
+        backdate(observations, 'timestamp', [observation.request.timestamp for observation in observations], batch_size)
+        created['Observation'] = len(observations)
+        created['Prescription'] = len(Prescription.objects.bulk_create(prescriptions, batch_size=batch_size))
+        bills = Billing.objects.bulk_create(bills, batch_size=batch_size)
+        backdate(bills, 'timestamp', [bill.request.timestamp for bill in bills], batch_size)
+        created['Billing'] = len(bills)
+
+        emergencies, emergency_times = [], []
+        for elderly_user in elderly_users:
+            for _ in range(emergencies_per_user):
+                emergencies.append(EmergencyNotification(
+                    elderly_user=elderly_user, caregiver=caregivers_of[elderly_user.id][0],
+                    status=weighted_choice(rng, EMERGENCY_STATUS_WEIGHTS),
+                ))
+                emergency_times.append(random_time())
+        emergencies = EmergencyNotification.objects.bulk_create(emergencies, batch_size=batch_size)
+        backdate(emergencies, 'timestamp', emergency_times, batch_size)
+        created['EmergencyNotification'] = len(emergencies)
+        feedback = [
+            FeedbackNotification(notification=emergency, message='A caregiver is on the way.',
+                                 status=rng.choice(('sent', 'read')))
+            for emergency in emergencies if emergency.status != 'sent'
+        ]
+        feedback = FeedbackNotification.objects.bulk_create(feedback, batch_size=batch_size)
+        backdate(feedback, 'timestamp', [item.notification.timestamp + timedelta(minutes=5) for item in feedback],
+                 batch_size)
+        created['FeedbackNotification'] = len(feedback)
+
+        rebuild_stats()
+        rebuild_search_index(batch_size)
+        transaction.on_commit(dispatcher.invalidate)
+        transaction.on_commit(slot_index.invalidate)
+    return created
@@ -0,0 +1,161 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import count
+
+TOP_ALLOCATIONS = 25
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+# Allocations made by the profilers themselves, including captures on other threads
+PROFILER_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+)
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_capture_ids = count()
+
+def start_tracing():
+    """Start tracemalloc unless another capture already has it running."""
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+def stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+def capture_name(url_name, role):
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    tag = re.sub(r'[^A-Za-z0-9_]+', '_', f'{url_name}-{role}')
+    return f'{stamp}-{tag}-{os.getpid()}-{next(_capture_ids)}'
+
+class ProfileCapture:
+    """
+    cProfile and tracemalloc around one request.
+
+    cProfile only sees the calling thread. tracemalloc is process-wide, so allocations
+    made by concurrent requests can show up in the snapshot too. Tracing slows the
+    request down, so captured durations are for ranking rather than absolute timings.
+    """
+
+    def __init__(self, url_name, role):
+        self.url_name = url_name
+        self.role = role
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        start_tracing()
+        try:
+            self.baseline = tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS)
+            tracemalloc.reset_peak()
+            self.started = time.perf_counter()
+            self.profiler.enable()
+        except BaseException:
+            # finish() will never run, so release tracing here
+            stop_tracing()
+            raise
+
+    def finish(self, directory, request, status_code, top=TOP_ALLOCATIONS):
+        """Stop profiling and write <name>.prof plus a <name>.json summary; returns the name."""
+        self.profiler.disable()
+        duration = time.perf_counter() - self.started
+        try:
+            snapshot = tracemalloc.take_snapshot().filter_traces(PROFILER_FILTERS)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            stop_tracing()
+        differences = snapshot.compare_to(self.baseline, 'lineno')
+        os.makedirs(directory, exist_ok=True)
+        name = capture_name(self.url_name, self.role)
+        self.profiler.dump_stats(os.path.join(directory, f'{name}.prof'))
+        summary = {
+            'url_name': self.url_name,
+            'role': self.role,
+            'method': request.method,
+            'path': request.path,
+            'status_code': status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'allocations': [
+                {
+                    'location': f'{difference.traceback[0].filename}:{difference.traceback[0].lineno}',
+                    'size_kb': round(difference.size_diff / 1024, 1),
+                    'count': difference.count_diff,
+                }
+                for difference in differences[:top] if difference.size_diff > 0
+            ],
+        }
+        with open(os.path.join(directory, f'{name}.json'), 'w') as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        return name
+
+def load_captures(directory, url_name=None, role=None):
+    """(prof path, summary) pairs of the captures in `directory` matching the filters."""
+    captures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        profile_path = os.path.join(directory, filename[:-len('.json')] + '.prof')
+        if not os.path.exists(profile_path):
+            continue
+        with open(os.path.join(directory, filename)) as summary_file:
+            summary = json.load(summary_file)
+        if (url_name and summary['url_name'] != url_name) or (role and summary['role'] != role):
+            continue
+        captures.append((profile_path, summary))
+    return captures
+
+def hot_functions(profile_paths, sort='cumulative', limit=30):
+    """Text report of the top functions over all the given profiles merged."""
+    stream = io.StringIO()
+    stats = pstats.Stats(*profile_paths, stream=stream)
+    # The header would otherwise list every merged file
+    stats.files = []
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+def request_summary(summaries):
+    """Per URL name and role: captures, mean and worst duration, worst peak memory; slowest first."""
+    groups = {}
+    for summary in summaries:
+        groups.setdefault((summary['url_name'], summary['role']), []).append(summary)
+    rows = []
+    for (url_name, role), group in groups.items():
+        durations = [summary['duration_ms'] for summary in group]
+        rows.append({
+            'url_name': url_name,
+            'role': role,
+            'captures': len(group),
+            'mean_ms': round(sum(durations) / len(durations), 2),
+            'max_ms': max(durations),
+            'max_peak_memory_kb': max(summary['peak_memory_kb'] for summary in group),
+        })
+    return sorted(rows, key=lambda row: row['mean_ms'] * row['captures'], reverse=True)
+
+def top_allocations(summaries, limit=TOP_ALLOCATIONS):
+    """Allocation sites summed over the captures, largest first."""
+    totals = {}
+    for summary in summaries:
+        for allocation in summary['allocations']:
+            size, allocations, captures = totals.get(allocation['location'], (0, 0, 0))
+            totals[allocation['location']] = (size + allocation['size_kb'], allocations + allocation['count'], captures + 1)
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    return [
+        {'location': location, 'size_kb': round(size, 1), 'count': allocations, 'captures': captures}
+        for location, (size, allocations, captures) in ranked[:limit]
+    ]
@@ -0,0 +1,181 @@
+import heapq
+import re
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MedicationReminder, Prescription
+
+DEFAULT_DOSE_INTERVAL = timedelta(days=1)
+# Only prescriptions due within the horizon are held in memory; the rest stay in the index
+SCHEDULER_HORIZON = timedelta(minutes=15)
+SCHEDULER_REFILL_INTERVAL = timedelta(minutes=1)
+EMIT_BATCH_SIZE = 1000
+
+FREQUENCY_WORDS = {
+    'once': 1, 'one': 1, 'twice': 2, 'two': 2, 'three': 3, 'thrice': 3, 'four': 4,
+}
+FREQUENCY_ABBREVIATIONS = {
+    'od': 1, 'qd': 1, 'daily': 1, 'nightly': 1, 'bd': 2, 'bid': 2, 'tds': 3, 'tid': 3, 'qid': 4, 'qds': 4,
+}
+EVERY_HOURS_RE = re.compile(r'(?:every|q)\s*(\d+)\s*(?:h\b|hr|hrs|hour|hours)')
+TIMES_PER_DAY_RE = re.compile(r'(\d+|once|one|twice|two|three|thrice|four)\s*(?:x|times?)?\s*(?:a|per|/)?\s*(?:day|daily)')
+DURATION_RE = re.compile(r'(\d+)\s*(day|days|d|week|weeks|wk|wks|w|month|months|mo)?\b')
+DURATION_UNITS = {'day': 1, 'days': 1, 'd': 1, 'week': 7, 'weeks': 7, 'wk': 7, 'wks': 7, 'w': 7,
+                  'month': 30, 'months': 30, 'mo': 30}
+
+def parse_dose_interval(dosage):
+    """Read how often a dose is due from free-text dosage such as "500mg twice daily" or "every 8 hours"."""
+    text = (dosage or '').lower()
+    match = EVERY_HOURS_RE.search(text)
+    if match and int(match.group(1)) > 0:
+        return timedelta(hours=int(match.group(1)))
+    if 'weekly' in text or 'once a week' in text:
+        return timedelta(weeks=1)
+    match = TIMES_PER_DAY_RE.search(text)
+    if match:
+        count = match.group(1)
+        count = FREQUENCY_WORDS[count] if count in FREQUENCY_WORDS else int(count)
+        if count > 0:
+            return timedelta(days=1) / count
+    for word in re.findall(r'[a-z]+', text):
+        if word in FREQUENCY_ABBREVIATIONS:
+            return timedelta(days=1) / FREQUENCY_ABBREVIATIONS[word]
+    # Prescriptions without a recognisable frequency are reminded once a day
+    return DEFAULT_DOSE_INTERVAL
+
+def parse_duration(duration):
+    """Read a course length such as "7 days" or "2 weeks"; None means ongoing."""
+    text = (duration or '').lower()
+    if any(word in text for word in ('ongoing', 'indefinite', 'continuous', 'lifelong')):
+        return None
+    match = DURATION_RE.search(text)
+    if not match or int(match.group(1)) == 0:
+        return None
+    return timedelta(days=int(match.group(1)) * DURATION_UNITS[match.group(2) or 'days'])
+
+def schedule_prescription(prescription, starts_at=None):
+    """Fill in the dose schedule of a new prescription; the first reminder is one interval after issue."""
+    prescription.starts_at = starts_at or timezone.now()
+    apply_schedule(prescription, prescription.starts_at)
+
+def reschedule_prescription(prescription, now=None):
+    """Apply an edited dosage or duration from now on, keeping when the course started."""
+    apply_schedule(prescription, now or timezone.now())
+
+def apply_schedule(prescription, first_dose_after):
+    interval = parse_dose_interval(prescription.dosage)
+    course = parse_duration(prescription.duration)
+    prescription.dose_interval_minutes = max(int(interval.total_seconds() // 60), 1)
+    prescription.ends_at = prescription.starts_at + course if course else None
+    prescription.next_dose_at = first_dose_after + timedelta(minutes=prescription.dose_interval_minutes)
+    if prescription.ends_at and prescription.next_dose_at > prescription.ends_at:
+        prescription.next_dose_at = None
+
+def following_dose(due_at, interval_minutes, ends_at, now):
+    """Next dose after `due_at`, skipping doses missed while the scheduler was down."""
+    interval = timedelta(minutes=interval_minutes)
+    next_due = due_at + interval
+    if next_due <= now:
+        next_due += interval * ((now - next_due) // interval + 1)
+    if ends_at and next_due > ends_at:
+        return None
+    return next_due
+
+class ReminderScheduler:
+    """
+    Turns prescription schedules into MedicationReminder rows as doses fall due.
+
+    Upcoming doses live in a min-heap keyed by due time. The heap is refilled with a
+    range scan on the partial next_dose_at index covering only the next horizon, so
+    each tick costs a heap pop per due dose rather than a pass over Prescription.
+    """
+
+    def __init__(self, horizon=SCHEDULER_HORIZON, refill_interval=SCHEDULER_REFILL_INTERVAL,
+                 batch_size=EMIT_BATCH_SIZE):
+        self.horizon = horizon
+        self.refill_interval = refill_interval
+        self.batch_size = batch_size
+        self.heap = []
+        self.scheduled = {}  # prescription_id -> due_at currently in the heap
+        self.loaded_until = None
+        self.last_refill = None
+
+    def push(self, prescription_id, due_at):
+        if self.scheduled.get(prescription_id) == due_at:
+            return
+        self.scheduled[prescription_id] = due_at
+        heapq.heappush(self.heap, (due_at, prescription_id))
+
+    def refill(self, now):
+        self.loaded_until = now + self.horizon
+        self.last_refill = now
+        upcoming = Prescription.objects.filter(next_dose_at__lt=self.loaded_until).values_list('id', 'next_dose_at')
+        for prescription_id, due_at in upcoming.iterator(chunk_size=self.batch_size):
+            self.push(prescription_id, due_at)
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+            due_at, prescription_id = heapq.heappop(self.heap)
+            # Entries superseded by a later push for the same prescription are skipped
+            if self.scheduled.get(prescription_id) == due_at:
+                del self.scheduled[prescription_id]
+                due.append((prescription_id, due_at))
+        return due
+
+    def emit(self, due, now):
+        """Create reminders for one batch of due doses and advance each prescription to its next dose."""
+        due_at_by_id = dict(due)
+        with transaction.atomic():
+            # Re-read the schedule so prescriptions edited or completed since loading are respected
+            prescriptions = list(
+                Prescription.objects.select_for_update()
+                .filter(id__in=due_at_by_id, next_dose_at__isnull=False)
+                .only('id', 'dose_interval_minutes', 'ends_at', 'next_dose_at', 'request__elderly_user')
+                .select_related('request')
+            )
+            reminders = []
+            for prescription in prescriptions:
+                if prescription.next_dose_at != due_at_by_id[prescription.id]:
+                    if prescription.next_dose_at < self.loaded_until:
+                        self.push(prescription.id, prescription.next_dose_at)
+                    continue
+                reminders.append(MedicationReminder(
+                    prescription_id=prescription.id,
+                    elderly_user_id=prescription.request.elderly_user_id,
+                    due_at=prescription.next_dose_at,
+                ))
+                prescription.next_dose_at = following_dose(
+                    prescription.next_dose_at, prescription.dose_interval_minutes, prescription.ends_at, now
+                )
+            MedicationReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+            Prescription.objects.bulk_update(prescriptions, ['next_dose_at'], batch_size=self.batch_size)
+        for prescription in prescriptions:
+            if prescription.next_dose_at and prescription.next_dose_at < self.loaded_until:
+                self.push(prescription.id, prescription.next_dose_at)
+        return len(reminders)
+
+    def tick(self, now=None):
+        """Emit every reminder due by `now`, in batches; returns the number created."""
+        now = now or timezone.now()
+        if self.last_refill is None or now - self.last_refill >= self.refill_interval:
+            self.refill(now)
+        emitted = 0
+        while True:
+            due = self.pop_due(now)
+            if not due:
+                return emitted
+            emitted += self.emit(due, now)
+
+def send_reminders_now(elderly_user):
+    """Immediate reminders for all of an elderly user's active prescriptions, e.g. sent by a caregiver."""
+    now = timezone.now()
+    prescription_ids = Prescription.objects.filter(
+        request__elderly_user=elderly_user, next_dose_at__isnull=False
+    ).values_list('id', flat=True)
+    return MedicationReminder.objects.bulk_create([
+        MedicationReminder(prescription_id=prescription_id, elderly_user=elderly_user, due_at=now)
+        for prescription_id in prescription_ids
+    ], ignore_conflicts=True)
@@ -0,0 +1,125 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RollupWatermark, VitalReading, VitalRollup
+
+WATERMARK_NAME = 'vital_readings'
+ROLLUP_CHUNK_SIZE = 10000
+# Ranges longer than this are served from rollups instead of raw readings
+RAW_READINGS_MAX_RANGE = timedelta(days=1)
+HOURLY_ROLLUPS_MAX_RANGE = timedelta(days=7)
+
+def bucket_start(measured_at, granularity):
+    """Truncate a reading time to the start of its UTC hour or day."""
+    measured_at = measured_at.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        measured_at = measured_at.replace(hour=0)
+    return measured_at
+
+def aggregate_readings(rows):
+    """Fold (elderly_user_id, metric, value, measured_at) rows into per-bucket count/total/min/max."""
+    buckets = {}
+    for elderly_user_id, metric, value, measured_at in rows:
+        for granularity, _ in VitalRollup.GRANULARITY_CHOICES:
+            key = (elderly_user_id, metric, granularity, bucket_start(measured_at, granularity))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [1, value, value, value]
+            else:
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+    return buckets
+
+def merge_buckets(buckets):
+    """Add aggregated buckets onto the stored rollups, creating the ones that do not exist yet."""
+    if not buckets:
+        return
+    existing = VitalRollup.objects.filter(
+        elderly_user_id__in={key[0] for key in buckets},
+        metric__in={key[1] for key in buckets},
+        bucket_start__in={key[3] for key in buckets},
+    )
+    to_update = []
+    for rollup in existing:
+        bucket = buckets.pop((rollup.elderly_user_id, rollup.metric, rollup.granularity, rollup.bucket_start), None)
+        if bucket is None:
+            continue
+        count, total, minimum, maximum = bucket
+        rollup.count += count
+        rollup.total += total
+        rollup.minimum = min(rollup.minimum, minimum)
+        rollup.maximum = max(rollup.maximum, maximum)
+        to_update.append(rollup)
+    VitalRollup.objects.bulk_update(to_update, ['count', 'total', 'minimum', 'maximum'], batch_size=1000)
+    VitalRollup.objects.bulk_create([
+        VitalRollup(
+            elderly_user_id=elderly_user_id, metric=metric, granularity=granularity, bucket_start=start,
+            count=count, total=total, minimum=minimum, maximum=maximum,
+        )
+        for (elderly_user_id, metric, granularity, start), (count, total, minimum, maximum) in buckets.items()
+    ], batch_size=1000)
+
+def rollup_vitals(chunk_size=ROLLUP_CHUNK_SIZE):
+    """
+    Fold every reading not yet rolled up into the hourly and daily rollups.
+
+    Readings are marked as they are folded rather than tracked by an id high-water mark:
+    ids are assigned before a transaction commits, so a reading committed late can carry
+    a lower id than one already rolled up. Each chunk is merged and marked in the same
+    transaction, with the watermark row locked, so the command can be rerun or interrupted
+    at any point without counting a reading twice. The watermark's last_reading_id is only
+    a record of progress and is never used to pick readings.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+            watermark = RollupWatermark.objects.select_for_update().get(name=WATERMARK_NAME)
+            rows = list(
+                VitalReading.objects.filter(rolled_up=False)
+                .order_by('id')
+                .values_list('id', 'elderly_user_id', 'metric', 'value', 'measured_at')[:chunk_size]
+            )
+            if not rows:
+                return processed
+            merge_buckets(aggregate_readings(row[1:] for row in rows))
+            VitalReading.objects.filter(id__in=[row[0] for row in rows]).update(rolled_up=True)
+            watermark.last_reading_id = max(watermark.last_reading_id, rows[-1][0])
+            watermark.save(update_fields=['last_reading_id', 'updated_at'])
+        processed += len(rows)
+
+def vital_trends(elderly_user_ids, start, end=None):
+    """
+    Return {elderly_user_id: {metric: [point, ...]}} for the range, oldest point first.
+
+    Ranges up to a day come straight from VitalReading; longer ranges read hourly or
+    daily rollups so the cost does not grow with the number of raw readings.
+    """
+    end = end or timezone.now()
+    trends = {elderly_user_id: {} for elderly_user_id in elderly_user_ids}
+    if end - start <= RAW_READINGS_MAX_RANGE:
+        readings = VitalReading.objects.filter(
+            elderly_user_id__in=elderly_user_ids, measured_at__gte=start, measured_at__lt=end
+        ).order_by('measured_at').values_list('elderly_user_id', 'metric', 'value', 'measured_at')
+        for elderly_user_id, metric, value, measured_at in readings:
+            trends[elderly_user_id].setdefault(metric, []).append({
+                'start': measured_at, 'count': 1, 'mean': value, 'minimum': value, 'maximum': value,
+            })
+        return trends
+    granularity = 'hour' if end - start <= HOURLY_ROLLUPS_MAX_RANGE else 'day'
+    rollups = VitalRollup.objects.filter(
+        elderly_user_id__in=elderly_user_ids,
+        granularity=granularity,
+        bucket_start__gte=bucket_start(start, granularity),
+        bucket_start__lt=end,
+    ).order_by('bucket_start')
+    for rollup in rollups:
+        trends[rollup.elderly_user_id].setdefault(rollup.metric, []).append({
+            'start': rollup.bucket_start, 'count': rollup.count, 'mean': rollup.mean,
+            'minimum': rollup.minimum, 'maximum': rollup.maximum,
+        })
+    return trends
@@ -0,0 +1,215 @@
+import re
+
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import HealthRecord, Observation, Prescription, SearchDocument, ServiceRequest
+
+SEARCH_RESULT_LIMIT = 20
+SEARCH_BATCH_SIZE = 1000
+SNIPPET_TOKENS = 16
+# Wrapped around matched terms by the database, then swapped for <mark> once the text is escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+SEARCH_KINDS = {HealthRecord: 'health_record', Observation: 'observation', Prescription: 'prescription'}
+FTS_TABLE = 'Elderly_searchdocument_fts'
+# BM25 parameters; a match in a medication name counts for more than one in the notes
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 4.0
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', d.title), 'A') || setweight(to_tsvector('english', d.body), 'B')"
+)
+POSTGRES_HEADLINE_OPTIONS = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20'
+
+def doctor_token(doctor_id):
+    return f'd{doctor_id}'
+
+def health_record_doctors(elderly_user_id):
+    """Doctor tokens of everyone who has taken one of the user's requests."""
+    doctor_ids = (
+        ServiceRequest.objects.filter(elderly_user_id=elderly_user_id, doctor__isnull=False)
+        .values_list('doctor_id', flat=True).distinct().order_by('doctor_id')
+    )
+    return ' '.join(doctor_token(doctor_id) for doctor_id in doctor_ids)
+
+def index_health_record(record):
+    SearchDocument.objects.update_or_create(
+        kind='health_record', object_id=record.id,
+        defaults={
+            'elderly_user_id': record.elderly_user_id,
+            'doctors': health_record_doctors(record.elderly_user_id),
+            'body': record.medical_history or '',
+        },
+    )
+
+def index_request_note(kind, obj, title, body):
+    elderly_user_id, doctor_id = ServiceRequest.objects.values_list('elderly_user_id', 'doctor_id').get(id=obj.request_id)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=obj.id,
+        defaults={
+            'elderly_user_id': elderly_user_id,
+            'request_id': obj.request_id,
+            'doctors': doctor_token(doctor_id) if doctor_id else '',
+            'title': title,
+            'body': body,
+        },
+    )
+
+def index_observation(observation):
+    index_request_note('observation', observation, '', observation.notes)
+
+def index_prescription(prescription):
+    index_request_note('prescription', prescription, prescription.medication_name, prescription.additional_notes)
+
+def unindex(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+def refresh_request_scope(request_id, elderly_user_id, doctor_id):
+    """Give a request's new doctor access to its notes and the patient's health record."""
+    SearchDocument.objects.filter(request_id=request_id).update(doctors=doctor_token(doctor_id) if doctor_id else '')
+    SearchDocument.objects.filter(elderly_user_id=elderly_user_id, kind='health_record').update(
+        doctors=health_record_doctors(elderly_user_id)
+    )
+
+def rebuild_search_index(batch_size=SEARCH_BATCH_SIZE):
+    """Recreate every search document from the source tables; returns the number indexed."""
+    request_doctors = {}
+    user_doctors = {}
+    for request_id, elderly_user_id, doctor_id in ServiceRequest.objects.values_list('id', 'elderly_user_id', 'doctor_id'):
+        request_doctors[request_id] = (elderly_user_id, doctor_id)
+        if doctor_id:
+            user_doctors.setdefault(elderly_user_id, set()).add(doctor_id)
+    total = 0
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        documents = []
+
+        def add(document):
+            nonlocal total
+            documents.append(document)
+            if len(documents) >= batch_size:
+                total += len(SearchDocument.objects.bulk_create(documents))
+                documents.clear()
+
+        for record_id, elderly_user_id, medical_history in (
+            HealthRecord.objects.values_list('id', 'elderly_user_id', 'medical_history').iterator(batch_size)
+        ):
+            doctors = ' '.join(doctor_token(doctor_id) for doctor_id in sorted(user_doctors.get(elderly_user_id, ())))
+            add(SearchDocument(kind='health_record', object_id=record_id, elderly_user_id=elderly_user_id,
+                               doctors=doctors, body=medical_history or ''))
+        notes = (
+            ('observation', Observation.objects.values_list('id', 'request_id', 'notes')),
+            ('prescription', Prescription.objects.values_list('id', 'request_id', 'medication_name', 'additional_notes')),
+        )
+        for kind, rows in notes:
+            for row in rows.iterator(batch_size):
+                object_id, request_id, *text = row
+                title, body = text if kind == 'prescription' else ('', text[0])
+                elderly_user_id, doctor_id = request_doctors[request_id]
+                add(SearchDocument(kind=kind, object_id=object_id, elderly_user_id=elderly_user_id,
+                                   request_id=request_id, doctors=doctor_token(doctor_id) if doctor_id else '',
+                                   title=title, body=body))
+        total += len(SearchDocument.objects.bulk_create(documents))
+    return total
+
+def match_expression(text):
+    """An FTS5 query matching every word of `text` in the title or body; None without any words."""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' AND '.join(f'"{word}"' for word in words)
+
+def mark_highlights(text):
+    return mark_safe(escape(text or '').replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>'))
+
+def make_snippet(highlighted, tokens=SNIPPET_TOKENS):
+    """About `tokens` words of highlighted text around its first match."""
+    words = highlighted.split()
+    first = next((i for i, word in enumerate(words) if HIGHLIGHT_START in word), 0)
+    start = max(min(first - tokens // 4, len(words) - tokens), 0)
+    window = ' '.join(words[start:start + tokens])
+    return ('…' if start else '') + window + ('…' if start + tokens < len(words) else '')
+
+def rank_matches(rows):
+    """
+    BM25 over the highlighted title and body of every match, best first.
+
+    Every match contains every query word, so the inverse document frequency FTS5's own
+    bm25() spends most of its time on (a scan of each word's postings across the whole
+    table) would scale each result alike; term counts come from the highlight markers and
+    lengths are averaged over the matches.
+    """
+    if not rows:
+        return []
+    lengths = [(len(title.split()), len(body.split())) for *_, title, body in rows]
+    average_title = max(sum(length for length, _ in lengths) / len(rows), 1)
+    average_body = max(sum(length for _, length in lengths) / len(rows), 1)
+
+    def bm25(highlighted, length, average):
+        frequency = highlighted.count(HIGHLIGHT_START)
+        return frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average))
+
+    scored = []
+    for row, (title_length, body_length) in zip(rows, lengths):
+        title, body = row[-2:]
+        score = TITLE_WEIGHT * bm25(title, title_length, average_title) + bm25(body, body_length, average_body)
+        scored.append((score, row))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
+
+def search_documents(doctor, text, limit=SEARCH_RESULT_LIMIT):
+    """
+    Best matches for `text` among the notes of this doctor's own requests and their patients' health records.
+
+    The doctor's token is part of the full-text query, so the index only ever walks the
+    documents this doctor may see and the cost follows their caseload, not the table size.
+    Titles and snippets come back as HTML with the matched words in <mark>.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    token = doctor_token(doctor.id)
+    if connection.vendor == 'postgresql':
+        sql = f'''
+            SELECT d.kind, d.object_id, d.request_id, d.elderly_user_id, e.first_name, e.last_name,
+                   ts_rank({POSTGRES_VECTOR}, q) AS rank,
+                   ts_headline('english', d.title, q, %s), ts_headline('english', d.body, q, %s)
+            FROM "Elderly_searchdocument" d
+            JOIN "Elderly_elderlyuser" e ON e.id = d.elderly_user_id,
+                 plainto_tsquery('english', %s) q
+            WHERE ({POSTGRES_VECTOR}) @@ q AND to_tsvector('simple', d.doctors) @@ to_tsquery('simple', %s)
+            ORDER BY rank DESC LIMIT %s
+        '''
+        params = [POSTGRES_HEADLINE_OPTIONS, POSTGRES_HEADLINE_OPTIONS, text, token, limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            scored = [(row[6], row[:6] + row[7:]) for row in cursor.fetchall()]
+    else:
+        sql = f'''
+            SELECT d.kind, d.object_id, d.request_id, d.elderly_user_id, e.first_name, e.last_name,
+                   highlight("{FTS_TABLE}", 0, %s, %s), highlight("{FTS_TABLE}", 1, %s, %s)
+            FROM "{FTS_TABLE}"
+            JOIN "Elderly_searchdocument" d ON d.id = "{FTS_TABLE}".rowid
+            JOIN "Elderly_elderlyuser" e ON e.id = d.elderly_user_id
+            WHERE "{FTS_TABLE}" MATCH %s
+        '''
+        match = f'doctors : "{token}" AND {{title body}} : ({expression})'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_STOP, HIGHLIGHT_START, HIGHLIGHT_STOP, match])
+            rows = cursor.fetchall()
+        scored = [(score, row[:7] + (make_snippet(row[7]),)) for score, row in rank_matches(rows)[:limit]]
+    return [
+        {
+            'kind': kind,
+            'object_id': object_id,
+            'request_id': request_id,
+            'elderly_user_id': elderly_user_id,
+            'elderly_user_name': f'{first_name or ""} {last_name or ""}'.strip(),
+            'title': mark_highlights(title),
+            'snippet': mark_highlights(snippet),
+            'score': round(score, 4),
+        }
+        for score, (kind, object_id, request_id, elderly_user_id, first_name, last_name, title, snippet) in scored
+    ]
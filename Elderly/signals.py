@@ -0,0 +1,135 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .availability import slot_index
+from .dashboards import dashboard_cache_key, invalidate_caregiver_dashboards, invalidate_elderly_dashboard
+from .dispatch import dispatcher
+from .events import broker, emergency_event, feedback_event
+from .models import (
+    Appointment, Caregiver, CaregiverAssignment, Doctor, DoctorAvailability, ElderlyUser, EmergencyNotification,
+    FeedbackNotification, HealthRecord, Observation, Prescription, ServiceRequest
+)
+from .search import (
+    SEARCH_KINDS, index_health_record, index_observation, index_prescription, refresh_request_scope, unindex
+)
+from .stats import STAT_KINDS, record_status_change
+
+@receiver([post_save, post_delete], sender=CaregiverAssignment)
+def refresh_emergency_routes(sender, instance, **kwargs):
+    # Only committed assignment changes reach the in-memory routing map
+    transaction.on_commit(lambda: dispatcher.refresh_elderly_user(instance.elderly_user_id))
+
+@receiver(post_save, sender=Caregiver)
+def refresh_caregiver_duty(sender, instance, **kwargs):
+    transaction.on_commit(lambda: dispatcher.set_on_duty(instance.id, instance.on_duty))
+
+@receiver(post_save, sender=EmergencyNotification)
+def publish_emergency(sender, instance, created, **kwargs):
+    if created:
+        event = emergency_event(instance.id, instance.elderly_user_id, instance.status, instance.timestamp)
+        transaction.on_commit(lambda: broker.publish(event))
+
+@receiver(post_save, sender=FeedbackNotification)
+def publish_feedback(sender, instance, created, **kwargs):
+    if created:
+        event = feedback_event(
+            instance.id, instance.notification.elderly_user_id, instance.message, instance.status, instance.timestamp
+        )
+        transaction.on_commit(lambda: broker.publish(event))
+
+@receiver([post_save, post_delete], sender=DoctorAvailability)
+@receiver([post_save, post_delete], sender=Appointment)
+def refresh_doctor_calendar(sender, instance, **kwargs):
+    transaction.on_commit(lambda: slot_index.refresh_doctor(instance.doctor_id))
+
+@receiver(post_save, sender=Doctor)
+def refresh_doctor_listing(sender, instance, **kwargs):
+    # Verification or specialization changes move the doctor in or out of slot search
+    transaction.on_commit(lambda: slot_index.refresh_doctor(instance.id))
+
+@receiver(post_init, sender=ServiceRequest)
+@receiver(post_init, sender=EmergencyNotification)
+def remember_saved_status(sender, instance, **kwargs):
+    # A deferred status is left unknown rather than loaded with an extra query
+    instance._saved_status = instance.__dict__.get('status', Ellipsis) if instance.pk else None
+
+@receiver(post_init, sender=Prescription)
+def remember_saved_schedule(sender, instance, **kwargs):
+    # Compared on save to tell when an edit changes the dose schedule; unknown if deferred
+    instance._saved_schedule = (
+        tuple(instance.__dict__.get(field, Ellipsis) for field in ('dosage', 'duration')) if instance.pk else None
+    )
+
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_save, sender=EmergencyNotification)
+def count_status_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'status' not in update_fields):
+        return
+    old_status = None if created else instance._saved_status
+    if old_status is Ellipsis:
+        return
+    # After commit, so the write does not hold the shared all-time counter row locked;
+    # reconcile_stats repairs counts lost to a crash in between
+    kind, timestamp, new_status = STAT_KINDS[sender], instance.timestamp, instance.status
+    transaction.on_commit(lambda: record_status_change(kind, timestamp, old_status, new_status))
+    instance._saved_status = instance.status
+
+@receiver(post_delete, sender=ServiceRequest)
+@receiver(post_delete, sender=EmergencyNotification)
+def count_deletion(sender, instance, **kwargs):
+    if instance._saved_status not in (None, Ellipsis):
+        kind, timestamp, old_status = STAT_KINDS[sender], instance.timestamp, instance._saved_status
+        transaction.on_commit(lambda: record_status_change(kind, timestamp, old_status, None))
+
+@receiver([post_save, post_delete], sender=ServiceRequest)
+def drop_elderly_dashboard(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_elderly_dashboard(instance.elderly_user_id))
+
+@receiver(post_save, sender=ElderlyUser)
+def drop_caregiver_dashboards(sender, instance, **kwargs):
+    # Caregiver dashboards cache the names of their assigned users
+    transaction.on_commit(lambda: invalidate_caregiver_dashboards(instance.id))
+
+@receiver([post_save, post_delete], sender=CaregiverAssignment)
+def drop_assignment_dashboard(sender, instance, **kwargs):
+    transaction.on_commit(lambda: cache.delete(dashboard_cache_key('caregiver', instance.caregiver_id)))
+
+@receiver(post_save, sender=HealthRecord)
+def index_health_record_text(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Vitals refreshes rewrite other columns only
+    if raw or (update_fields is not None and 'medical_history' not in update_fields):
+        return
+    index_health_record(instance)
+
+@receiver(post_save, sender=Observation)
+def index_observation_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_observation(instance)
+
+@receiver(post_save, sender=Prescription)
+def index_prescription_text(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Dose scheduling updates leave the searchable text alone
+    if raw or (update_fields is not None and not {'medication_name', 'additional_notes'} & set(update_fields)):
+        return
+    index_prescription(instance)
+
+@receiver(post_delete, sender=HealthRecord)
+@receiver(post_delete, sender=Observation)
+@receiver(post_delete, sender=Prescription)
+def unindex_text(sender, instance, **kwargs):
+    unindex(SEARCH_KINDS[sender], instance.id)
+
+@receiver(post_init, sender=ServiceRequest)
+def remember_saved_doctor(sender, instance, **kwargs):
+    instance._saved_doctor_id = instance.__dict__.get('doctor_id', Ellipsis) if instance.pk else None
+
+@receiver(post_save, sender=ServiceRequest)
+def refresh_search_scope(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'doctor' not in update_fields):
+        return
+    if instance.doctor_id != instance._saved_doctor_id and not (created and instance.doctor_id is None):
+        # Runs in the saving transaction so a new doctor finds the notes as soon as the request is theirs
+        refresh_request_scope(instance.id, instance.elderly_user_id, instance.doctor_id)
+    instance._saved_doctor_id = instance.doctor_id
@@ -0,0 +1,31 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Live emergency and feedback alerts for caregivers, pushed over Server-Sent Events
+    var list = document.getElementById('live-alerts');
+    if (!list || !window.EventSource) {
+        return;
+    }
+    var namesElement = document.getElementById('assigned-user-names');
+    var names = namesElement ? JSON.parse(namesElement.textContent) : {};
+    var seen = {};
+    var source = new EventSource(list.dataset.streamUrl + '?since=' + list.dataset.since);
+
+    function showAlert(event) {
+        var data = JSON.parse(event.data);
+        var key = data.type + ':' + data.id;
+        if (seen[key]) {
+            return;
+        }
+        seen[key] = true;
+        var name = names[data.elderly_user_id] || 'Elderly user #' + data.elderly_user_id;
+        var item = document.createElement('li');
+        if (data.type === 'emergency') {
+            item.textContent = 'Emergency from ' + name + ' at ' + new Date(data.timestamp).toLocaleString();
+        } else {
+            item.textContent = 'Feedback for ' + name + ': ' + data.message;
+        }
+        list.insertBefore(item, list.firstChild);
+    }
+
+    source.addEventListener('emergency', showAlert);
+    source.addEventListener('feedback', showAlert);
+});
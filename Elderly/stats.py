@@ -0,0 +1,61 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import EmergencyNotification, PlatformStat, ServiceRequest
+
+STAT_MODELS = {
+    'service_request': ServiceRequest,
+    'emergency': EmergencyNotification,
+}
+STAT_KINDS = {model: kind for kind, model in STAT_MODELS.items()}
+
+def bump(kind, status, day, delta):
+    """Add `delta` to the day and all-time counters of one status, creating them on first use."""
+    for stat_day in (day, None):
+        counter = PlatformStat.objects.filter(kind=kind, status=status, day=stat_day)
+        if counter.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                PlatformStat.objects.create(kind=kind, status=status, day=stat_day, count=delta)
+        except IntegrityError:
+            # Another writer created the row first
+            counter.update(count=F('count') + delta)
+
+def record_status_change(kind, timestamp, old_status, new_status):
+    """Move one row between status counters; None on either side means created or deleted."""
+    if old_status == new_status:
+        return
+    day = timezone.localdate(timestamp)
+    with transaction.atomic():
+        if old_status is not None:
+            bump(kind, old_status, day, -1)
+        if new_status is not None:
+            bump(kind, new_status, day, 1)
+
+def rebuild_stats():
+    """Recount every counter from the source tables."""
+    with transaction.atomic():
+        PlatformStat.objects.all().delete()
+        stats = []
+        for kind, model in STAT_MODELS.items():
+            totals = {}
+            rows = (
+                model.objects.annotate(day=TruncDate('timestamp'))
+                .values('status', 'day').annotate(count=Count('id')).order_by()
+            )
+            for row in rows:
+                stats.append(PlatformStat(kind=kind, status=row['status'], day=row['day'], count=row['count']))
+                totals[row['status']] = totals.get(row['status'], 0) + row['count']
+            stats += [PlatformStat(kind=kind, status=status, count=count) for status, count in totals.items()]
+        PlatformStat.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+def stat_totals():
+    """All-time counts as {kind: {status: count}}, read from the small set of total rows."""
+    totals = {kind: {} for kind in STAT_MODELS}
+    for kind, status, count in PlatformStat.objects.filter(day__isnull=True).values_list('kind', 'status', 'count'):
+        totals.setdefault(kind, {})[status] = count
+    return totals
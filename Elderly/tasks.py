@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .jobs import job
+from .models import FeedbackNotification
+
+@job('deliver_feedback_notification')
+def deliver_feedback_notification(feedback_id):
+    # Delivery runs in the worker so email (and later push/SMS) never blocks a request
+    feedback = FeedbackNotification.objects.select_related('notification__elderly_user__user').get(id=feedback_id)
+    user = feedback.notification.elderly_user.user
+    if user.email:
+        send_mail(
+            'Elderly Care notification',
+            feedback.message,
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+        )
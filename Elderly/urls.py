@@ -12,6 +12,7 @@ urlpatterns = [
     path('service-booking/', views.service_booking, name='service_booking'),
     path('emergency-button/', views.emergency_button, name='emergency_button'),  # Ensure this line is correct
     path('health-records/', views.health_records, name='health_records'),
+    path('vitals/ingest/', views.ingest_vitals, name='ingest_vitals'),
     path('prescriptions/', views.prescriptions, name='prescriptions'),
     path('billing-section/', views.billing_section, name='billing_section'),
     path('medication-reminders/', views.medication_reminders, name='medication_reminders'),
@@ -29,8 +30,10 @@ urlpatterns = [
     path('appointment-scheduling/', views.appointment_scheduling, name='appointment_scheduling'),
     path('assigned-elderly-users/', views.assigned_elderly_users, name='assigned_elderly_users'),
     path('emergency-alerts/', views.emergency_alerts, name='emergency_alerts'),
+    path('emergency-alerts/stream/', views.emergency_stream, name='emergency_stream'),
     path('view-requests/', views.view_requests, name='view_requests'),
     path('accept-request/<int:request_id>/', views.accept_request, name='accept_request'),
+    path('claim-next-request/', views.claim_next, name='claim_next'),
     path('reject-request/<int:request_id>/', views.reject_request, name='reject_request'),
     path('elderly-user-details/<int:elderly_user_id>/', views.elderly_user_details, name='elderly_user_details'),
     path('access-health-records/<int:elderly_user_id>/', views.access_health_records, name='access_health_records'),
@@ -41,13 +44,21 @@ urlpatterns = [
     path('verify-doctor/<int:doctor_id>/', views.verify_doctor, name='verify_doctor'),
     path('verify-doctor-list/', views.verify_doctor_list, name='verify_doctor_list'),  # New URL for listing unverified doctors
     path('manage-users/', views.manage_users, name='manage_users'),
+    path('exports/<str:name>/', views.export_data, name='export_data'),
+    path('metrics', views.metrics, name='metrics'),
     path('generate-reports/', views.generate_reports, name='generate_reports'),
     path('system-settings/', views.system_settings, name='system_settings'),
     path('mark-prescription-completed/<int:prescription_id>/', views.mark_prescription_completed, name='mark_prescription_completed'),
     path('send-medication-reminder/<int:elderly_user_id>/', views.send_medication_reminder, name='send_medication_reminder'),
     path('schedule-appointment/<int:request_id>/', views.schedule_appointment, name='schedule_appointment'),
+    path('appointments/slots/', views.available_slots, name='available_slots'),
+    path('doctor-availability/', views.doctor_availability, name='doctor_availability'),
+    path('doctor-availability/<int:availability_id>/delete/', views.delete_availability, name='delete_availability'),
+    path('search/', views.search_records, name='search_records'),
     path('assign-caregiver-to-elderly/', views.assign_caregiver_to_elderly, name='assign_caregiver_to_elderly'),
     path('deactivate-user/<int:user_id>/', views.deactivate_user, name='deactivate_user'),  # New path for deactivating users
     path('pay-now/<int:bill_id>/', views.pay_now, name='pay_now'),
+    path('confirm-payment/<int:bill_id>/', views.confirm_payment, name='confirm_payment'),
     path('mark-medication-taken/<int:notification_id>/', views.mark_medication_taken, name='mark_medication_taken'),
+    path('mark-reminder-taken/<int:reminder_id>/', views.mark_reminder_taken, name='mark_reminder_taken'),
 ]
\ No newline at end of file
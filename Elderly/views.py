@@ -1,14 +1,65 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
+import asyncio
+import hmac
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_POST
 from .models import (
-    CustomUser, ElderlyUser, Caregiver, Doctor, Admin, EmergencyNotification, FeedbackNotification,
-    HealthRecord, Observation, ServiceRequest, Prescription, Billing
+    CustomUser, ElderlyUser, Caregiver, CaregiverAssignment, Doctor, DoctorAvailability, Admin, EmergencyNotification,
+    FeedbackNotification, HealthRecord, MedicationReminder, Observation, ServiceRequest, Prescription, Billing,
+    SearchDocument
 )
 from .forms import (
     UserRegistrationForm, UserProfileForm, CaregiverProfileForm, DoctorProfileForm, AdminProfileForm,
-    HealthRecordForm, ObservationForm, PrescriptionForm, BillingForm
+    HealthRecordForm, ObservationForm, PrescriptionForm, BillingForm, DoctorAvailabilityForm
 )
+from .pagination import keyset_paginate
+from .stats import stat_totals
+from .exports import EXPORT_FORMATS, EXPORTS, export_queryset, parse_export_date, stream_export
+from .dashboards import assigned_user_names, caregiver_dashboard_context, elderly_dashboard_context
+from .claims import claim_next_request, claim_request
+from .availability import DEFAULT_SLOT_COUNT, MAX_SLOT_COUNT, book_appointment, slot_index
+from .detection import detect_abnormal_readings
+from .dispatch import dispatcher
+from .events import KEEPALIVE_INTERVAL, POLL_INTERVAL, REPLAY_OVERLAP, broker, events_since, format_sse
+from .jobs import enqueue
+from .metrics import metrics_store, render_metrics
+from .reminders import send_reminders_now
+from .rollups import vital_trends
+from .search import SEARCH_RESULT_LIMIT, search_documents
+from .vitals import parse_ingest_payload, record_readings, validate_ingest_items
+
+DEFAULT_TREND_DAYS = 7
+MAX_TREND_DAYS = 365
+
+def get_trend_days(request):
+    try:
+        days = int(request.GET.get('days', DEFAULT_TREND_DAYS))
+    except ValueError:
+        days = DEFAULT_TREND_DAYS
+    return min(max(days, 1), MAX_TREND_DAYS)
+
+def attach_vital_trends(elderly_users, days):
+    # Trends longer than a day are read from VitalRollup rather than raw readings
+    trends = vital_trends([elderly_user.id for elderly_user in elderly_users], timezone.now() - timedelta(days=days))
+    for elderly_user in elderly_users:
+        elderly_user.vital_trends = trends[elderly_user.id]
+
+def live_alert_context(caregiver):
+    # Lets the page open the event stream from the moment it was rendered
+    return {
+        'stream_since': int(timezone.now().timestamp() * 1000),
+        'assigned_user_names': assigned_user_names(caregiver),
+    }
 
 def home(request):
     if request.user.is_authenticated:
@@ -23,22 +74,12 @@ def user_login(request):
         user = authenticate(request, username=email, password=password)
         if user is not None:
             login(request, user)
-            # Redirect based on user role and profile completion
-            if user.role == 'elderly':
-                if not hasattr(user, 'elderlyuser') or not user.elderlyuser.first_name:
-                    return redirect('elderly:profile')
-                return redirect('elderly:dashboard')
-            elif user.role == 'caregiver':
-                if not hasattr(user, 'caregiver') or not user.caregiver.first_name:
-                    return redirect('elderly:profile')
+            # Redirect based on user role; RoleProfileMiddleware sends incomplete profiles
+            # and unverified doctors on from there
+            if user.role in ('elderly', 'caregiver'):
                 return redirect('elderly:dashboard')
             elif user.role == 'doctor':
-                if not hasattr(user, 'doctor') or not user.doctor.first_name:
-                    return redirect('elderly:profile')
-                if user.doctor.verified_status:
-                    return redirect('elderly:doctor_dashboard')
-                else:
-                    return render(request, 'elderly/unverified_doctor.html')
+                return redirect('elderly:doctor_dashboard')
             elif user.role == 'admin':
                 # Admins do not need to complete their profile
                 return redirect('elderly:admin_dashboard')
@@ -63,40 +104,14 @@ def user_register(request):
 def dashboard(request):
     user = request.user
     if user.role == 'elderly':
-        if not hasattr(user, 'elderlyuser') or not user.elderlyuser.first_name:
-            return redirect('elderly:profile')
-        # Ensure default health record exists
-        health_record, created = HealthRecord.objects.get_or_create(elderly_user=user.elderlyuser)
-        if created:
-            health_record.save()
-        # Get the latest service request status
-        request_status = None
-        latest_request = ServiceRequest.objects.filter(elderly_user=user.elderlyuser).order_by('-timestamp').first()
-        if latest_request:
-            request_status = latest_request.status
-        return render(request, 'elderly/dashboard.html', {'request_status': request_status})
+        # Cached per user; signals drop the entry when its requests change
+        return render(request, 'elderly/dashboard.html', elderly_dashboard_context(request.profile))
     elif user.role == 'caregiver':
-        if not hasattr(user, 'caregiver') or not user.caregiver.first_name:
-            return redirect('elderly:profile')
-        # Ensure assigned_users is not None
-        assigned_users = user.caregiver.assigned_users if user.caregiver.assigned_users else []
-        emergency_notifications = EmergencyNotification.objects.filter(
-            elderly_user__id__in=assigned_users,
-            status='sent'
-        ).order_by('-timestamp')
-        feedback_notifications = FeedbackNotification.objects.filter(
-            notification__elderly_user__id__in=assigned_users
-        ).order_by('-timestamp')
         return render(request, 'elderly/caregiver_dashboard.html', {
-            'assigned_users': assigned_users,
-            'emergency_notifications': emergency_notifications,
-            'feedback_notifications': feedback_notifications
+            **caregiver_dashboard_context(request.profile),
+            'stream_since': int(timezone.now().timestamp() * 1000),
         })
     elif user.role == 'doctor':
-        if not hasattr(user, 'doctor') or not user.doctor.first_name:
-            return redirect('elderly:profile')
-        if not user.doctor.verified_status:
-            return render(request, 'elderly/unverified_doctor.html')
         return redirect('elderly:doctor_dashboard')
     elif user.role == 'admin':
         return redirect('elderly:admin_dashboard')
@@ -107,37 +122,37 @@ def profile(request):
     user = request.user
     if user.role == 'elderly':
         if request.method == 'POST':
-            form = UserProfileForm(request.POST, instance=user.elderlyuser)
+            form = UserProfileForm(request.POST, instance=request.profile)
             if form.is_valid():
                 form.save()
                 return redirect('elderly:dashboard')
         else:
-            if hasattr(user, 'elderlyuser'):
-                form = UserProfileForm(instance=user.elderlyuser)
+            if request.profile:
+                form = UserProfileForm(instance=request.profile)
             else:
                 ElderlyUser.objects.create(user=user)
                 form = UserProfileForm()
     elif user.role == 'caregiver':
         if request.method == 'POST':
-            form = CaregiverProfileForm(request.POST, instance=user.caregiver)
+            form = CaregiverProfileForm(request.POST, instance=request.profile)
             if form.is_valid():
                 form.save()
                 return redirect('elderly:dashboard')
         else:
-            if hasattr(user, 'caregiver'):
-                form = CaregiverProfileForm(instance=user.caregiver)
+            if request.profile:
+                form = CaregiverProfileForm(instance=request.profile)
             else:
-                Caregiver.objects.create(user=user, assigned_users=[])
+                Caregiver.objects.create(user=user)
                 form = CaregiverProfileForm()
     elif user.role == 'doctor':
         if request.method == 'POST':
-            form = DoctorProfileForm(request.POST, instance=user.doctor)
+            form = DoctorProfileForm(request.POST, instance=request.profile)
             if form.is_valid():
                 form.save()
                 return redirect('elderly:dashboard')
         else:
-            if hasattr(user, 'doctor'):
-                form = DoctorProfileForm(instance=user.doctor)
+            if request.profile:
+                form = DoctorProfileForm(instance=request.profile)
             else:
                 Doctor.objects.create(user=user)
                 form = DoctorProfileForm()
@@ -148,10 +163,12 @@ def profile(request):
 
 @login_required
 def service_booking(request):
+    if request.user.role != 'elderly':
+        return redirect('elderly:dashboard')
     if request.method == 'POST':
         specialization = request.POST.get('specialization')
         ServiceRequest.objects.create(
-            elderly_user=request.user.elderlyuser,
+            elderly_user=request.profile,
             specialization=specialization,
             status='pending'
         )
@@ -160,21 +177,16 @@ def service_booking(request):
 
 @login_required
 def emergency_button(request):
-    if request.user.role == 'elderly':
-        caregiver = Caregiver.objects.first()  # Simplified for demonstration
-        if caregiver:
-            EmergencyNotification.objects.create(
-                elderly_user=request.user.elderlyuser,
-                caregiver=caregiver,
-                status='sent'
-            )
+    if request.user.role == 'elderly' and request.profile:
+        # Routed to an on-duty caregiver assigned to this user
+        dispatcher.dispatch(request.profile)
         return redirect('elderly:dashboard')
     return redirect('elderly:dashboard')
 
 @login_required
 def health_records(request):
     if request.user.role == 'elderly':
-        health_record, created = HealthRecord.objects.get_or_create(elderly_user=request.user.elderlyuser)
+        health_record, created = HealthRecord.objects.get_or_create(elderly_user=request.profile)
         if request.method == 'POST':
             form = HealthRecordForm(request.POST, instance=health_record)
             if form.is_valid():
@@ -195,7 +207,7 @@ def health_records(request):
             service_request = ServiceRequest.objects.filter(
                 elderly_user=elderly_user,
                 status='accepted',
-                doctor=request.user.doctor
+                doctor=request.profile
             ).first()
             
             if not service_request:
@@ -217,6 +229,8 @@ def health_records(request):
             observations = Observation.objects.filter(request=service_request).order_by('-timestamp')
             prescriptions = Prescription.objects.filter(request=service_request).order_by('-request__timestamp')
             billing = Billing.objects.filter(request=service_request).order_by('-timestamp').first()
+            trend_days = get_trend_days(request)
+            attach_vital_trends([elderly_user], trend_days)
             
             return render(request, 'elderly/access_health_records.html', {
                 'health_record': health_record,
@@ -225,41 +239,72 @@ def health_records(request):
                 'prescriptions': prescriptions,
                 'billing': billing,
                 'request_id': service_request.id,  # Pass the request_id
+                'trend_days': trend_days,
             })
     return redirect('elderly:dashboard')
 
+@login_required
+@require_POST
+def ingest_vitals(request):
+    # Accepts a JSON array or newline-delimited JSON of readings from home-monitoring devices
+    if request.user.role == 'elderly' and request.profile:
+        default_elderly_user_id = request.profile.id
+        allowed_elderly_user_ids = {default_elderly_user_id}
+    elif request.user.role == 'caregiver' and request.profile:
+        default_elderly_user_id = None
+        allowed_elderly_user_ids = set(request.profile.assigned_users.values_list('id', flat=True))
+    else:
+        return JsonResponse({'error': 'Only elderly users and caregivers can submit vitals.'}, status=403)
+    try:
+        items = parse_ingest_payload(request.body, request.content_type)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    readings, errors = validate_ingest_items(items, allowed_elderly_user_ids, default_elderly_user_id)
+    with transaction.atomic():
+        record_readings(readings)
+    return JsonResponse({
+        'accepted': len(readings),
+        'rejected': len(errors),
+        'errors': errors,
+    }, status=200 if not errors else 207)
+
 @login_required
 def prescriptions(request):
     if request.user.role == 'elderly':
-        prescriptions = Prescription.objects.filter(request__elderly_user=request.user.elderlyuser, request__status='accepted')
+        prescriptions = Prescription.objects.filter(request__elderly_user=request.profile, request__status='accepted')
         return render(request, 'elderly/prescriptions.html', {'prescriptions': prescriptions})
     return redirect('elderly:dashboard')
 
 @login_required
 def billing_section(request):
     if request.user.role == 'elderly':
-        bills = Billing.objects.filter(request__elderly_user=request.user.elderlyuser)
-        return render(request, 'elderly/billing_section.html', {'bills': bills})
+        page = keyset_paginate(
+            request, Billing.objects.filter(request__elderly_user=request.profile), ['-timestamp', '-id']
+        )
+        return render(request, 'elderly/billing_section.html', {'bills': page.items, 'page': page})
     return redirect('elderly:dashboard')
 
 @login_required
 def medication_reminders(request):
     if request.user.role == 'elderly':
-        notifications = FeedbackNotification.objects.filter(notification__elderly_user=request.user.elderlyuser, status='sent')
-        return render(request, 'elderly/medication_reminders.html', {'notifications': notifications})
+        reminders = MedicationReminder.objects.filter(
+            elderly_user=request.profile, status='sent'
+        ).select_related('prescription').order_by('-due_at')
+        return render(request, 'elderly/medication_reminders.html', {'reminders': reminders})
     return redirect('elderly:dashboard')
 
 @login_required
 def notifications(request):
     if request.user.role == 'elderly':
-        notifications = FeedbackNotification.objects.filter(notification__elderly_user=request.user.elderlyuser)
-        return render(request, 'elderly/notifications.html', {'notifications': notifications})
+        notifications = FeedbackNotification.objects.filter(notification__elderly_user=request.profile)
     elif request.user.role == 'caregiver':
         notifications = FeedbackNotification.objects.filter(
-            notification__elderly_user__id__in=request.user.caregiver.assigned_users
-        ).order_by('-timestamp')
-        return render(request, 'elderly/notifications.html', {'notifications': notifications})
-    return redirect('elderly:dashboard')
+            notification__elderly_user__in=request.profile.assigned_users.all()
+        )
+    else:
+        return redirect('elderly:dashboard')
+    page = keyset_paginate(request, notifications, ['-timestamp', '-id'])
+    return render(request, 'elderly/notifications.html', {'notifications': page.items, 'page': page})
 
 @login_required
 def logout_confirm(request):
@@ -269,7 +314,7 @@ def logout_confirm_action(request):
     if request.method == 'POST':
         logout(request)
         return redirect('elderly:home')
-    return redirect('elderly:logout_confirm')
+    return redirect('elderly:logout')
 
 @login_required
 def unverified_doctor(request):
@@ -295,14 +340,17 @@ def elderly_profile(request, elderly_user_id):
 def acknowledge_emergency(request, notification_id):
     try:
         notification = EmergencyNotification.objects.get(id=notification_id)
-        if notification.caregiver == request.user.caregiver:
-            notification.status = 'acknowledged'
-            notification.save()
-            FeedbackNotification.objects.create(
-                notification=notification,
-                message="Help is on the way!",
-                status='sent'
-            )
+        if request.user.role == 'caregiver' and notification.caregiver_id == request.profile.id:
+            with transaction.atomic():
+                notification.status = 'acknowledged'
+                notification.save()
+                feedback = FeedbackNotification.objects.create(
+                    notification=notification,
+                    message="Help is on the way!",
+                    status='sent'
+                )
+                # Delivery happens in the background worker
+                enqueue('deliver_feedback_notification', feedback_id=feedback.id)
             return redirect('elderly:dashboard')
     except EmergencyNotification.DoesNotExist:
         pass
@@ -312,7 +360,7 @@ def acknowledge_emergency(request, notification_id):
 def resolve_emergency(request, notification_id):
     try:
         notification = EmergencyNotification.objects.get(id=notification_id)
-        if notification.caregiver == request.user.caregiver:
+        if request.user.role == 'caregiver' and notification.caregiver_id == request.profile.id:
             notification.status = 'resolved'
             notification.save()
             return redirect('elderly:dashboard')
@@ -323,65 +371,106 @@ def resolve_emergency(request, notification_id):
 @login_required
 def monitoring_tools(request):
     if request.user.role == 'caregiver':
-        # Ensure assigned_users is not None
-        assigned_users = request.user.caregiver.assigned_users if request.user.caregiver.assigned_users else []
-        # Fetch health records for assigned elderly users
+        # Fetch assigned elderly users together with their health record in one query
+        elderly_users = list(request.profile.assigned_users.select_related('healthrecord').order_by('id'))
+        trend_days = get_trend_days(request)
+        attach_vital_trends(elderly_users, trend_days)
+        # Range checks run server side over all patients' recent readings in one pass
+        abnormal_readings = detect_abnormal_readings([elderly_user.id for elderly_user in elderly_users])
         health_records = {}
-        for user_id in assigned_users:
-            elderly_user = get_object_or_404(ElderlyUser, id=user_id)
-            records = HealthRecord.objects.filter(elderly_user=elderly_user).order_by('-last_updated')
+        for elderly_user in elderly_users:
+            records = [elderly_user.healthrecord] if hasattr(elderly_user, 'healthrecord') else []
+            elderly_user.abnormal_readings = abnormal_readings[elderly_user.id]
             health_records[elderly_user] = records
-        # Estimated ranges for health metrics
-        health_metrics_ranges = {
-            'blood_pressure': {'low': (90, 120), 'high': (140, 180)},
-            'heart_rate': {'low': 60, 'high': 100},
-            'sugar_levels': {'low': 70, 'high': 110},  # Fasting glucose levels
-        }
         return render(request, 'elderly/monitoring_tools.html', {
             'health_records': health_records,
-            'health_metrics_ranges': health_metrics_ranges
+            'trend_days': trend_days,
         })
     return redirect('elderly:dashboard')
 
 @login_required
 def medication_management(request):
     if request.user.role == 'caregiver':
-        # Ensure assigned_users is not None
-        assigned_users = request.user.caregiver.assigned_users if request.user.caregiver.assigned_users else []
-        # Fetch prescriptions for assigned elderly users
-        prescriptions = {}
-        for user_id in assigned_users:
-            elderly_user = get_object_or_404(ElderlyUser, id=user_id)
-            user_prescriptions = Prescription.objects.filter(request__elderly_user=elderly_user)
-            prescriptions[elderly_user] = user_prescriptions
+        elderly_users = list(request.profile.assigned_users.order_by('id'))
+        # Fetch prescriptions for all assigned elderly users at once and group them per user
+        prescriptions = {elderly_user: [] for elderly_user in elderly_users}
+        by_id = {elderly_user.id: elderly_user for elderly_user in elderly_users}
+        user_prescriptions = Prescription.objects.filter(
+            request__elderly_user__in=elderly_users
+        ).select_related('request')
+        for prescription in user_prescriptions:
+            prescriptions[by_id[prescription.request.elderly_user_id]].append(prescription)
         return render(request, 'elderly/medication_management.html', {
             'prescriptions': prescriptions
         })
     return redirect('elderly:dashboard')
 
+APPOINTMENT_SLOT_CHOICES = 5
+
+def render_appointment_scheduling(request, error=None):
+    elderly_users = list(request.profile.assigned_users.order_by('id'))
+    # Fetch pending service requests for all assigned elderly users at once and group them per user
+    service_requests = {elderly_user: [] for elderly_user in elderly_users}
+    by_id = {elderly_user.id: elderly_user for elderly_user in elderly_users}
+    user_requests = ServiceRequest.objects.filter(elderly_user__in=elderly_users, status='pending')
+    slots_by_specialization = {}
+    for service_request in user_requests:
+        if service_request.specialization not in slots_by_specialization:
+            slots_by_specialization[service_request.specialization] = slot_index.earliest_slots(
+                service_request.specialization, APPOINTMENT_SLOT_CHOICES
+            )
+        service_request.free_slots = slots_by_specialization[service_request.specialization]
+        service_requests[by_id[service_request.elderly_user_id]].append(service_request)
+    return render(request, 'elderly/appointment_scheduling.html', {
+        'service_requests': service_requests,
+        'error': error,
+    })
+
 @login_required
 def appointment_scheduling(request):
     if request.user.role == 'caregiver':
-        # Ensure assigned_users is not None
-        assigned_users = request.user.caregiver.assigned_users if request.user.caregiver.assigned_users else []
-        # Fetch service requests for assigned elderly users
-        service_requests = {}
-        for user_id in assigned_users:
-            elderly_user = get_object_or_404(ElderlyUser, id=user_id)
-            user_requests = ServiceRequest.objects.filter(elderly_user=elderly_user, status='pending')
-            service_requests[elderly_user] = user_requests
-        return render(request, 'elderly/appointment_scheduling.html', {
-            'service_requests': service_requests
-        })
+        return render_appointment_scheduling(request)
     return redirect('elderly:dashboard')
 
+def parse_slot_after(value):
+    if not value:
+        return None
+    try:
+        after = parse_datetime(value)
+    except ValueError:
+        return None
+    if after is not None and timezone.is_naive(after):
+        after = timezone.make_aware(after)
+    return after
+
+@login_required
+def available_slots(request):
+    specialization = request.GET.get('specialization')
+    if not specialization:
+        return JsonResponse({'error': 'specialization is required.'}, status=400)
+    try:
+        count = min(max(int(request.GET.get('count', DEFAULT_SLOT_COUNT)), 1), MAX_SLOT_COUNT)
+    except ValueError:
+        return JsonResponse({'error': 'count must be an integer.'}, status=400)
+    after = parse_slot_after(request.GET.get('after'))
+    if request.GET.get('after') and after is None:
+        return JsonResponse({'error': 'after must be an ISO 8601 datetime.'}, status=400)
+    slots = slot_index.earliest_slots(specialization, count, after=after)
+    return JsonResponse({'slots': [
+        {
+            'doctor_id': slot['doctor_id'],
+            'doctor_name': slot['doctor_name'],
+            'start': slot['start'].isoformat(),
+            'end': slot['end'].isoformat(),
+        }
+        for slot in slots
+    ]})
+
 @login_required
 def assigned_elderly_users(request):
     if request.user.role == 'caregiver':
-        # Ensure assigned_users is not None
-        assigned_users = request.user.caregiver.assigned_users if request.user.caregiver.assigned_users else []
         # Fetch detailed profiles for assigned elderly users
-        elderly_users = ElderlyUser.objects.filter(id__in=assigned_users)
+        elderly_users = request.profile.assigned_users.all()
         return render(request, 'elderly/assigned_elderly_users.html', {
             'elderly_users': elderly_users
         })
@@ -390,46 +479,164 @@ def assigned_elderly_users(request):
 @login_required
 def emergency_alerts(request):
     if request.user.role == 'caregiver':
-        # Ensure assigned_users is not None
-        assigned_users = request.user.caregiver.assigned_users if request.user.caregiver.assigned_users else []
         emergency_notifications = EmergencyNotification.objects.filter(
-            elderly_user__id__in=assigned_users,
+            elderly_user__in=request.profile.assigned_users.all(),
             status='sent'
-        ).order_by('-timestamp')
+        ).select_related('elderly_user').order_by('-timestamp')
         return render(request, 'elderly/emergency_alerts.html', {
-            'emergency_notifications': emergency_notifications
+            'emergency_notifications': emergency_notifications,
+            **live_alert_context(request.profile),
+        })
+    return redirect('elderly:dashboard')
+
+def parse_stream_cursor(request):
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        return datetime.fromtimestamp(int(cursor) / 1000, tz=dt_timezone.utc) - REPLAY_OVERLAP
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+async def live_event_stream(elderly_user_ids, since):
+    subscription = broker.subscribe(elderly_user_ids)
+    try:
+        yield f'retry: {POLL_INTERVAL * 1000}\n\n'
+        if since is not None:
+            for event in await sync_to_async(events_since)(elderly_user_ids, since):
+                yield format_sse(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+@login_required
+async def emergency_stream(request):
+    user = await request.auser()
+    if user.role != 'caregiver':
+        return HttpResponseForbidden()
+    elderly_user_ids = [
+        elderly_user_id async for elderly_user_id in
+        CaregiverAssignment.objects.filter(caregiver__user=user).values_list('elderly_user_id', flat=True)
+    ]
+    since = parse_stream_cursor(request)
+    if isinstance(request, ASGIRequest):
+        stream = live_event_stream(elderly_user_ids, since)
+    else:
+        # WSGI fallback: send what is new since the cursor and close. EventSource reconnects
+        # after the retry interval, carrying the cursor forward in Last-Event-ID.
+        now = timezone.now()
+        events = await sync_to_async(events_since)(elderly_user_ids, since or now)
+        stream = [f'retry: {POLL_INTERVAL * 1000}\n\n'] + [format_sse(event) for event in events]
+        stream.append(f'id: {int(now.timestamp() * 1000)}\n\n')
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+def doctor_availability(request):
+    if request.user.role == 'doctor':
+        doctor = request.profile
+        if request.method == 'POST':
+            form = DoctorAvailabilityForm(request.POST)
+            if form.is_valid():
+                window = form.save(commit=False)
+                window.doctor = doctor
+                window.save()
+                return redirect('elderly:doctor_availability')
+        else:
+            form = DoctorAvailabilityForm()
+        windows = DoctorAvailability.objects.filter(doctor=doctor, ends_at__gt=timezone.now()).order_by('starts_at')
+        appointments = doctor.appointments.filter(ends_at__gt=timezone.now()).select_related(
+            'service_request__elderly_user'
+        ).order_by('starts_at')
+        return render(request, 'elderly/doctor_availability.html', {
+            'form': form,
+            'windows': windows,
+            'appointments': appointments,
         })
     return redirect('elderly:dashboard')
 
+@login_required
+def delete_availability(request, availability_id):
+    if request.user.role == 'doctor' and request.method == 'POST':
+        DoctorAvailability.objects.filter(id=availability_id, doctor=request.profile).delete()
+    return redirect('elderly:doctor_availability')
+
+@login_required
+def search_records(request):
+    if request.user.role != 'doctor':
+        return redirect('elderly:dashboard')
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_RESULT_LIMIT)), 1), SEARCH_RESULT_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer.'}, status=400)
+    results = search_documents(request.profile, query, limit=limit)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': results})
+    kind_labels = dict(SearchDocument.KIND_CHOICES)
+    for result in results:
+        result['kind_label'] = kind_labels[result['kind']]
+    return render(request, 'elderly/search_records.html', {'query': query, 'results': results})
+
 @login_required
 def view_requests(request):
     if request.user.role == 'doctor':
-        if not hasattr(request.user, 'doctor') or not request.user.doctor.first_name:
-            return redirect('elderly:profile')
-        if not request.user.doctor.verified_status:
-            return render(request, 'elderly/unverified_doctor.html')
-        pending_requests = ServiceRequest.objects.filter(status='pending', specialization=request.user.doctor.specialization)
-        return render(request, 'elderly/view_requests.html', {'pending_requests': pending_requests})
+        pending_requests = ServiceRequest.objects.filter(
+            status='pending', specialization=request.profile.specialization
+        ).select_related('elderly_user')
+        page = keyset_paginate(request, pending_requests, ['timestamp', 'id'])
+        return render(request, 'elderly/view_requests.html', {'pending_requests': page.items, 'page': page})
     return redirect('elderly:dashboard')
 
+def render_view_requests(request, error):
+    pending_requests = ServiceRequest.objects.filter(
+        status='pending', specialization=request.profile.specialization
+    ).select_related('elderly_user')
+    page = keyset_paginate(request, pending_requests, ['timestamp', 'id'])
+    return render(request, 'elderly/view_requests.html', {
+        'pending_requests': page.items,
+        'page': page,
+        'error': error
+    })
+
+CLAIM_STATUS_ERRORS = {
+    'rejected': 'This request has been rejected.',
+    'completed': 'This request has already been completed.',
+}
+
 @login_required
 def accept_request(request, request_id):
     if request.user.role == 'doctor':
-        try:
-            service_request = ServiceRequest.objects.get(id=request_id, status='pending')
-            if service_request.specialization == request.user.doctor.specialization:
-                service_request.status = 'accepted'
-                service_request.doctor = request.user.doctor
-                service_request.save()
-                # Redirect to elderly user details page
-                return redirect('elderly:elderly_user_details', elderly_user_id=service_request.elderly_user.id)
-            else:
-                return render(request, 'elderly/view_requests.html', {
-                    'pending_requests': ServiceRequest.objects.filter(status='pending', specialization=request.user.doctor.specialization),
-                    'error': 'This request is not for your specialization.'
-                })
-        except ServiceRequest.DoesNotExist:
-            pass
+        if claim_request(request_id, request.profile):
+            elderly_user_id = ServiceRequest.objects.values_list('elderly_user_id', flat=True).get(id=request_id)
+            # Redirect to elderly user details page
+            return redirect('elderly:elderly_user_details', elderly_user_id=elderly_user_id)
+        service_request = ServiceRequest.objects.filter(id=request_id).first()
+        if service_request is not None:
+            if service_request.status == 'pending':
+                return render_view_requests(request, 'This request is not for your specialization.')
+            if service_request.status in CLAIM_STATUS_ERRORS:
+                return render_view_requests(request, CLAIM_STATUS_ERRORS[service_request.status])
+            if service_request.doctor_id == request.profile.id:
+                # Accepted twice by the same doctor, e.g. a resubmitted form
+                return redirect('elderly:elderly_user_details', elderly_user_id=service_request.elderly_user_id)
+            return render_view_requests(request, 'This request has already been accepted by another doctor.')
+    return redirect('elderly:dashboard')
+
+@login_required
+@require_POST
+def claim_next(request):
+    if request.user.role == 'doctor':
+        service_request = claim_next_request(request.profile)
+        if service_request is None:
+            return render_view_requests(request, 'There are no pending requests to claim.')
+        return redirect('elderly:elderly_user_details', elderly_user_id=service_request.elderly_user_id)
     return redirect('elderly:dashboard')
 
 @login_required
@@ -460,7 +667,7 @@ def access_health_records(request, elderly_user_id):
             service_request = ServiceRequest.objects.filter(
                 elderly_user=elderly_user,
                 status='accepted',
-                doctor=request.user.doctor
+                doctor=request.profile
             ).first()
             
             if not service_request:
@@ -475,6 +682,8 @@ def access_health_records(request, elderly_user_id):
             observations = Observation.objects.filter(request=service_request).order_by('-timestamp')
             prescriptions = Prescription.objects.filter(request=service_request).order_by('-request__timestamp')
             billing = Billing.objects.filter(request=service_request).order_by('-timestamp').first()
+            trend_days = get_trend_days(request)
+            attach_vital_trends([elderly_user], trend_days)
             
             return render(request, 'elderly/access_health_records.html', {
                 'health_record': health_record,
@@ -483,6 +692,7 @@ def access_health_records(request, elderly_user_id):
                 'prescriptions': prescriptions,
                 'billing': billing,
                 'request_id': service_request.id,  # Pass the request_id
+                'trend_days': trend_days,
             })
         except ElderlyUser.DoesNotExist:
             pass
@@ -502,30 +712,24 @@ def record_observations(request, request_id):
             ).order_by('-timestamp').first()
             
             if not emergency_notification:
-                # Create a new EmergencyNotification if none exists
-                caregiver = Caregiver.objects.first()  # Simplified for demonstration
-                if caregiver:
-                    emergency_notification = EmergencyNotification.objects.create(
-                        elderly_user=elderly_user,
-                        caregiver=caregiver,
-                        status='sent'
-                    )
-                else:
-                    return redirect('elderly:access_health_records', elderly_user_id=elderly_user.id)
+                # Create a new EmergencyNotification routed to the user's caregivers if none exists
+                emergency_notification = dispatcher.dispatch(elderly_user)
             
             if request.method == 'POST':
                 form = ObservationForm(request.POST)
                 if form.is_valid():
-                    observation = form.save(commit=False)
-                    observation.request = service_request
-                    observation.save()
-                    
-                    # Create a feedback notification for the elderly user
-                    FeedbackNotification.objects.create(
-                        notification=emergency_notification,
-                        message=form.cleaned_data['notes'],
-                        status='sent'
-                    )
+                    with transaction.atomic():
+                        observation = form.save(commit=False)
+                        observation.request = service_request
+                        observation.save()
+
+                        # Create a feedback notification for the elderly user and queue its delivery
+                        feedback = FeedbackNotification.objects.create(
+                            notification=emergency_notification,
+                            message=form.cleaned_data['notes'],
+                            status='sent'
+                        )
+                        enqueue('deliver_feedback_notification', feedback_id=feedback.id)
                     
                     return redirect('elderly:access_health_records', elderly_user_id=elderly_user.id)
         except ServiceRequest.DoesNotExist:
@@ -568,7 +772,7 @@ def specify_service_cost(request, request_id):
 def complete_session(request, request_id):
     if request.user.role == 'doctor':
         try:
-            service_request = ServiceRequest.objects.get(id=request_id, status='accepted', doctor=request.user.doctor)
+            service_request = ServiceRequest.objects.get(id=request_id, status='accepted', doctor=request.profile)
             service_request.status = 'completed'
             service_request.save()
             return redirect('elderly:view_requests')
@@ -579,8 +783,8 @@ def complete_session(request, request_id):
 @login_required
 def verify_doctor_list(request):
     if request.user.role == 'admin':
-        doctors = Doctor.objects.filter(verified_status=False)
-        return render(request, 'elderly/verify_doctor_list.html', {'doctors': doctors})
+        page = keyset_paginate(request, Doctor.objects.filter(verified_status=False).select_related('user'), ['id'])
+        return render(request, 'elderly/verify_doctor_list.html', {'doctors': page.items, 'page': page})
     return redirect('elderly:dashboard')
 
 @login_required
@@ -605,22 +809,24 @@ def verify_doctor(request, doctor_id):
 @login_required
 def manage_users(request):
     if request.user.role == 'admin':
-        if not hasattr(request.user, 'admin') or not request.user.admin.permissions:
+        if not request.profile or not request.profile.permissions:
             return redirect('elderly:profile')
-        users = CustomUser.objects.all()
-        return render(request, 'elderly/manage_users.html', {'users': users})
+        users = CustomUser.objects.select_related('elderlyuser', 'caregiver', 'doctor', 'admin')
+        page = keyset_paginate(request, users, ['-date_joined', '-id'])
+        return render(request, 'elderly/manage_users.html', {'users': page.items, 'page': page})
     return redirect('elderly:dashboard')
 
 @login_required
 def generate_reports(request):
     if request.user.role == 'admin':
-        if not hasattr(request.user, 'admin') or not request.user.admin.permissions:
+        if not request.profile or not request.profile.permissions:
             return redirect('elderly:profile')
-        # Placeholder for generating reports
-        num_requests = ServiceRequest.objects.count()
-        num_completed_sessions = ServiceRequest.objects.filter(status='completed').count()
-        num_emergency_notifications = EmergencyNotification.objects.count()
-        num_resolved_emergencies = EmergencyNotification.objects.filter(status='resolved').count()
+        # Counters are kept current by signals; see Elderly.stats
+        totals = stat_totals()
+        num_requests = sum(totals['service_request'].values())
+        num_completed_sessions = totals['service_request'].get('completed', 0)
+        num_emergency_notifications = sum(totals['emergency'].values())
+        num_resolved_emergencies = totals['emergency'].get('resolved', 0)
         return render(request, 'elderly/generate_reports.html', {
             'num_requests': num_requests,
             'num_completed_sessions': num_completed_sessions,
@@ -629,10 +835,35 @@ def generate_reports(request):
         })
     return redirect('elderly:dashboard')
 
+EXPORT_CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+@login_required
+def export_data(request, name):
+    if request.user.role != 'admin':
+        return redirect('elderly:dashboard')
+    if not request.profile or not request.profile.permissions:
+        return redirect('elderly:profile')
+    if name not in EXPORTS:
+        raise Http404('Unknown export.')
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}.'}, status=400)
+    try:
+        start = parse_export_date(request.GET.get('from'))
+        end = parse_export_date(request.GET.get('to'))
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    queryset = export_queryset(name, start, end, request.GET.get('status'))
+    response = StreamingHttpResponse(
+        stream_export(name, export_format, queryset), content_type=EXPORT_CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+    return response
+
 @login_required
 def system_settings(request):
     if request.user.role == 'admin':
-        if not hasattr(request.user, 'admin') or not request.user.admin.permissions:
+        if not request.profile or not request.profile.permissions:
             return redirect('elderly:profile')
         # Placeholder for system settings
         return render(request, 'elderly/system_settings.html')
@@ -645,6 +876,9 @@ def mark_prescription_completed(request, prescription_id):
             prescription = get_object_or_404(Prescription, id=prescription_id)
             prescription.request.status = 'completed'
             prescription.request.save()
+            # Stop scheduling reminders for a completed course
+            prescription.next_dose_at = None
+            prescription.save(update_fields=['next_dose_at'])
             return redirect('elderly:medication_management')
         except Prescription.DoesNotExist:
             pass
@@ -654,9 +888,10 @@ def mark_prescription_completed(request, prescription_id):
 def send_medication_reminder(request, elderly_user_id):
     if request.user.role == 'caregiver':
         try:
-            elderly_user = get_object_or_404(ElderlyUser, id=elderly_user_id)
-            # Logic to send medication reminder
-            # Placeholder for now
+            # Only the user's own caregivers may remind them
+            elderly_user = get_object_or_404(ElderlyUser, id=elderly_user_id, caregivers=request.profile)
+            if request.method == 'POST':
+                send_reminders_now(elderly_user)
             return redirect('elderly:medication_management')
         except ElderlyUser.DoesNotExist:
             pass
@@ -665,16 +900,24 @@ def send_medication_reminder(request, elderly_user_id):
 @login_required
 def schedule_appointment(request, request_id):
     if request.user.role == 'caregiver':
-        try:
-            service_request = get_object_or_404(ServiceRequest, id=request_id, status='pending')
-            if request.method == 'POST':
-                # Logic to schedule appointment
-                # Placeholder for now
-                service_request.status = 'scheduled'
-                service_request.save()
-                return redirect('elderly:appointment_scheduling')
-        except ServiceRequest.DoesNotExist:
-            pass
+        service_request = get_object_or_404(
+            ServiceRequest, id=request_id, status='pending', elderly_user__caregivers=request.profile
+        )
+        if request.method == 'POST':
+            slot = request.POST.get('slot', '')
+            doctor_id, _, starts_at = slot.partition('|')
+            starts_at = parse_slot_after(starts_at)
+            if not doctor_id.isdigit() or starts_at is None:
+                # No slot picked: take the earliest one available
+                slots = slot_index.earliest_slots(service_request.specialization, 1)
+                if not slots:
+                    return render_appointment_scheduling(request, 'No free slots are available for this specialization.')
+                doctor_id, starts_at = slots[0]['doctor_id'], slots[0]['start']
+            doctor = Doctor.objects.filter(
+                id=doctor_id, verified_status=True, specialization=service_request.specialization
+            ).first()
+            if doctor is None or book_appointment(service_request, doctor, starts_at) is None:
+                return render_appointment_scheduling(request, 'That slot is no longer available. Please pick another.')
     return redirect('elderly:appointment_scheduling')
 
 @login_required
@@ -686,19 +929,21 @@ def assign_caregiver_to_elderly(request):
             try:
                 caregiver = get_object_or_404(Caregiver, user_id=caregiver_id)
                 elderly_user = get_object_or_404(ElderlyUser, id=elderly_user_id)
-                if caregiver.assigned_users:
-                    caregiver.assigned_users.append(elderly_user_id)
-                else:
-                    caregiver.assigned_users = [elderly_user_id]
-                caregiver.save()
+                CaregiverAssignment.objects.get_or_create(caregiver=caregiver, elderly_user=elderly_user)
                 return redirect('elderly:assign_caregiver_to_elderly')
             except (Caregiver.DoesNotExist, ElderlyUser.DoesNotExist):
                 pass
-        caregivers = Caregiver.objects.all()
-        elderly_users = ElderlyUser.objects.all()
+        caregiver_page = keyset_paginate(
+            request, Caregiver.objects.select_related('user'), ['id'], param='caregiver_cursor'
+        )
+        elderly_page = keyset_paginate(
+            request, ElderlyUser.objects.select_related('user'), ['id'], param='elderly_cursor'
+        )
         return render(request, 'elderly/assign_caregiver_to_elderly.html', {
-            'caregivers': caregivers,
-            'elderly_users': elderly_users
+            'caregivers': caregiver_page.items,
+            'elderly_users': elderly_page.items,
+            'caregiver_page': caregiver_page,
+            'elderly_page': elderly_page
         })
     return redirect('elderly:dashboard')
 
@@ -718,7 +963,7 @@ def deactivate_user(request, user_id):
 def pay_now(request, bill_id):
     if request.user.role == 'elderly':
         try:
-            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.user.elderlyuser)
+            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.profile)
             if request.method == 'POST':
                 bill.payment_status = 'paid'
                 bill.save()
@@ -731,7 +976,7 @@ def pay_now(request, bill_id):
 def mark_medication_taken(request, notification_id):
     if request.user.role == 'elderly':
         try:
-            notification = get_object_or_404(FeedbackNotification, id=notification_id, notification__elderly_user=request.user.elderlyuser)
+            notification = get_object_or_404(FeedbackNotification, id=notification_id, notification__elderly_user=request.profile)
             if request.method == 'POST':
                 notification.status = 'read'
                 notification.save()
@@ -740,13 +985,18 @@ def mark_medication_taken(request, notification_id):
             pass
     return redirect('elderly:medication_reminders')
 
+@login_required
+def mark_reminder_taken(request, reminder_id):
+    if request.user.role == 'elderly':
+        reminder = get_object_or_404(MedicationReminder, id=reminder_id, elderly_user=request.profile)
+        if request.method == 'POST':
+            reminder.status = 'taken'
+            reminder.save(update_fields=['status'])
+    return redirect('elderly:medication_reminders')
+
 @login_required
 def doctor_dashboard(request):
     if request.user.role == 'doctor':
-        if not hasattr(request.user, 'doctor') or not request.user.doctor.first_name:
-            return redirect('elderly:profile')
-        if not request.user.doctor.verified_status:
-            return render(request, 'elderly/unverified_doctor.html')
         return render(request, 'elderly/doctor_dashboard.html')
     return redirect('elderly:user_login')
 
@@ -754,7 +1004,7 @@ def doctor_dashboard(request):
 def pay_now_page(request, bill_id):
     if request.user.role == 'elderly':
         try:
-            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.user.elderlyuser)
+            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.profile)
             if request.method == 'POST':
                 # Simulate payment processing
                 bill.payment_status = 'paid'
@@ -769,7 +1019,7 @@ def pay_now_page(request, bill_id):
 def pay_now(request, bill_id):
     if request.user.role == 'elderly':
         try:
-            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.user.elderlyuser)
+            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.profile)
             return render(request, 'elderly/pay_now_confirmation.html', {'bill': bill})
         except Billing.DoesNotExist:
             pass
@@ -779,7 +1029,7 @@ def pay_now(request, bill_id):
 def confirm_payment(request, bill_id):
     if request.user.role == 'elderly':
         try:
-            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.user.elderlyuser)
+            bill = get_object_or_404(Billing, id=bill_id, request__elderly_user=request.profile)
             if request.method == 'POST':
                 # Simulate payment processing
                 bill.payment_status = 'paid'
@@ -797,7 +1047,7 @@ def elderly_user_details(request, elderly_user_id):
             service_request = ServiceRequest.objects.filter(
                 elderly_user=elderly_user,
                 status='accepted',
-                doctor=request.user.doctor
+                doctor=request.profile
             ).first()
             if service_request:
                 return render(request, 'elderly/elderly_user_details.html', {
@@ -806,4 +1056,14 @@ def elderly_user_details(request, elderly_user_id):
                 })
         except ElderlyUser.DoesNotExist:
             pass
-    return redirect('elderly:dashboard')
\ No newline at end of file
+    return redirect('elderly:dashboard')
+
+def metrics(request):
+    # Scraped by Prometheus rather than people, so a bearer token stands in for a login
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise Http404
+    if not hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(metrics_store), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,181 @@
+import json
+import math
+import re
+from decimal import Decimal
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import HealthRecord, VitalReading
+
+BLOOD_PRESSURE_RE = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*$')
+
+# Ingest batches are written in chunks of this size inside a single transaction
+INGEST_CHUNK_SIZE = 1000
+INGEST_MAX_ITEMS = 100000
+# Accepted range per metric; sugar levels are cached in a DecimalField(5, 2)
+VITAL_RANGES = {
+    'heart_rate': (0, 300),
+    'sugar_levels': (0, 999.99),
+}
+# HealthRecord field holding when the cached value of each metric was measured
+VITAL_MEASURED_AT_FIELDS = {
+    'blood_pressure': 'blood_pressure_measured_at',
+    'heart_rate': 'heart_rate_measured_at',
+    'sugar_levels': 'sugar_levels_measured_at',
+}
+
+def parse_blood_pressure(value):
+    """Split a reading such as "120/80" into (systolic, diastolic) integers."""
+    match = BLOOD_PRESSURE_RE.match(str(value or ''))
+    if not match:
+        raise ValueError(f'Invalid blood pressure reading: {value!r}. Use the format "120/80".')
+    systolic, diastolic = int(match.group(1)), int(match.group(2))
+    if diastolic >= systolic:
+        raise ValueError(f'Invalid blood pressure reading: {value!r}. Systolic must exceed diastolic.')
+    return systolic, diastolic
+
+def build_reading(elderly_user_id, metric, value, measured_at):
+    """Return an unsaved VitalReading, raising ValueError if the value does not parse."""
+    if metric == 'blood_pressure':
+        systolic, diastolic = parse_blood_pressure(value)
+        return VitalReading(
+            elderly_user_id=elderly_user_id,
+            metric=metric,
+            value=systolic,
+            systolic=systolic,
+            diastolic=diastolic,
+            measured_at=measured_at,
+        )
+    if metric not in ('heart_rate', 'sugar_levels'):
+        raise ValueError(f'Unknown metric: {metric!r}')
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid {metric} reading: {value!r}')
+    if not math.isfinite(value):
+        raise ValueError(f'Invalid {metric} reading: {value!r}')
+    low, high = VITAL_RANGES[metric]
+    if not low <= value <= high:
+        raise ValueError(f'{metric} reading {value!r} is outside the range {low}-{high}.')
+    return VitalReading(elderly_user_id=elderly_user_id, metric=metric, value=value, measured_at=measured_at)
+
+def readings_from_health_record(health_record, changed_fields, measured_at=None):
+    """Build readings for the vitals a HealthRecordForm submission changed."""
+    measured_at = measured_at or timezone.now()
+    readings = []
+    for metric in ('blood_pressure', 'heart_rate', 'sugar_levels'):
+        value = getattr(health_record, metric)
+        if metric in changed_fields and value not in (None, ''):
+            readings.append(build_reading(health_record.elderly_user_id, metric, value, measured_at))
+    return readings
+
+def apply_latest_readings(health_record, readings):
+    """
+    Copy the newest reading of each metric onto the cached HealthRecord fields.
+
+    A metric is only overwritten by a reading measured after the cached one, so backfilled
+    history leaves newer values in place.
+    """
+    latest = {}
+    for reading in readings:
+        current = latest.get(reading.metric)
+        if current is None or reading.measured_at >= current.measured_at:
+            latest[reading.metric] = reading
+    for metric, reading in latest.items():
+        measured_at_field = VITAL_MEASURED_AT_FIELDS[metric]
+        cached_at = getattr(health_record, measured_at_field)
+        if cached_at is not None and reading.measured_at < cached_at:
+            continue
+        setattr(health_record, measured_at_field, reading.measured_at)
+        if metric == 'blood_pressure':
+            health_record.blood_pressure = f'{reading.systolic}/{reading.diastolic}'
+            health_record.blood_pressure_systolic = reading.systolic
+            health_record.blood_pressure_diastolic = reading.diastolic
+        elif metric == 'heart_rate':
+            health_record.heart_rate = round(reading.value)
+        else:
+            sugar_levels = Decimal(str(reading.value)).quantize(Decimal('0.01'))
+            health_record.sugar_levels = min(sugar_levels, Decimal(str(VITAL_RANGES['sugar_levels'][1])))
+        if health_record.vitals_measured_at is None or reading.measured_at > health_record.vitals_measured_at:
+            health_record.vitals_measured_at = reading.measured_at
+
+def record_readings(readings, batch_size=INGEST_CHUNK_SIZE):
+    """Append readings to the history and refresh the cached latest values per elderly user."""
+    VitalReading.objects.bulk_create(readings, batch_size=batch_size)
+    by_user = {}
+    for reading in readings:
+        by_user.setdefault(reading.elderly_user_id, []).append(reading)
+    if not by_user:
+        return
+    health_records = {
+        record.elderly_user_id: record
+        for record in HealthRecord.objects.filter(elderly_user_id__in=by_user)
+    }
+    # Readings may arrive before the elderly user ever opened their dashboard
+    for elderly_user_id in by_user.keys() - health_records.keys():
+        health_records[elderly_user_id] = HealthRecord.objects.create(elderly_user_id=elderly_user_id)
+    for elderly_user_id, user_readings in by_user.items():
+        apply_latest_readings(health_records[elderly_user_id], user_readings)
+    HealthRecord.objects.bulk_update(
+        health_records.values(),
+        ['blood_pressure', 'blood_pressure_systolic', 'blood_pressure_diastolic', 'heart_rate', 'sugar_levels',
+         'vitals_measured_at', *VITAL_MEASURED_AT_FIELDS.values()],
+        batch_size=batch_size,
+    )
+
+def parse_ingest_payload(body, content_type):
+    """Decode a JSON array or newline-delimited JSON body into a list of items."""
+    text = body.decode('utf-8')
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f'Line {line_number}: {exc.msg}')
+    else:
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f'Invalid JSON: {exc.msg}')
+        if not isinstance(items, list):
+            raise ValueError('Expected a JSON array of readings.')
+    if len(items) > INGEST_MAX_ITEMS:
+        raise ValueError(f'A batch may contain at most {INGEST_MAX_ITEMS} readings.')
+    return items
+
+def validate_ingest_items(items, allowed_elderly_user_ids, default_elderly_user_id=None):
+    """Turn decoded items into unsaved readings, collecting a per-item error for each rejected one."""
+    readings = []
+    errors = []
+    default_tz = timezone.get_current_timezone()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'error': 'Each reading must be a JSON object.'})
+            continue
+        elderly_user_id = item.get('elderly_user_id', default_elderly_user_id)
+        if elderly_user_id not in allowed_elderly_user_ids:
+            errors.append({'index': index, 'error': f'Not allowed to record vitals for elderly user {elderly_user_id!r}.'})
+            continue
+        measured_at = item.get('measured_at')
+        try:
+            parsed = parse_datetime(measured_at) if isinstance(measured_at, str) else None
+        except ValueError:
+            # Well formed but impossible, such as February 30th
+            parsed = None
+        if parsed is None:
+            errors.append({'index': index, 'error': 'measured_at must be an ISO 8601 datetime.'})
+            continue
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, default_tz)
+        value = item.get('value')
+        if item.get('metric') == 'blood_pressure' and value is None and 'systolic' in item:
+            value = f"{item.get('systolic')}/{item.get('diastolic')}"
+        try:
+            readings.append(build_reading(elderly_user_id, item.get('metric'), value, parsed))
+        except ValueError as exc:
+            errors.append({'index': index, 'error': str(exc)})
+    return readings, errors